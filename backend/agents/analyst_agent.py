@@ -8,10 +8,21 @@ Agent for data analysis, numbers, and logical constructions.
 from typing import Optional, List, Dict, Any
 
 from agents.base import BaseAgent, AgentContext, AgentResponse
+from core.keywords import compile_keywords
 from llm.openrouter import openrouter
 from llm.base import LLMMessage
 
 
+# Key insight indicators
+_INSIGHT_MARKERS_RE = compile_keywords((
+    "ключевой вывод", "важный вывод",
+    "обнаружено", "выявлено",
+    "паттерн", "тренд",
+    "аномалия", "отклонение",
+    "рекомендация",
+))
+
+
 class AnalystAgent(BaseAgent):
     """
     Analyst Agent — аналитический агент.
@@ -127,18 +138,8 @@ class AnalystAgent(BaseAgent):
         """Determine if analysis contains valuable insights."""
         response_lower = response.lower()
         
-        # Key insight indicators
-        insight_markers = [
-            "ключевой вывод", "важный вывод",
-            "обнаружено", "выявлено",
-            "паттерн", "тренд",
-            "аномалия", "отклонение",
-            "рекомендация",
-        ]
-        
-        for marker in insight_markers:
-            if marker in response_lower:
-                return True, "insight"
+        if _INSIGHT_MARKERS_RE.search(response_lower):
+            return True, "insight"
         
         # If response has structured conclusions, save as fact
         if "## выводы" in response_lower or "## conclusions" in response_lower:
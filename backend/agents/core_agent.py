@@ -8,10 +8,47 @@ Main dialogue agent that embodies the user's thinking style.
 from typing import Optional
 
 from agents.base import BaseAgent, AgentContext, AgentResponse
+from core.keywords import compile_keywords
 from llm.openrouter import openrouter
 from llm.base import LLMMessage
 
 
+# Decision indicators
+_DECISION_KEYWORDS = (
+    "решил", "решение", "решаю",
+    "принимаю", "принял решение",
+    "выбираю", "выбор сделан",
+    "буду делать", "будем делать",
+    "утверждаю", "одобряю",
+    "цель", "моя цель", "жизненная цель",
+)
+
+# Insight/Fact indicators
+_INSIGHT_KEYWORDS = (
+    "понял", "осознал", "вывод",
+    "инсайт", "понимаю теперь",
+    "ключевой момент", "важно что",
+    "принцип", "мое правило", "убеждение",
+    "ценность", "идеал", "миссия",
+)
+
+# Personal/Family facts - ВСЕГДА сохраняем!
+_PERSONAL_KEYWORDS = (
+    "внук", "внучк", "сын", "дочь", "дочер", "ребенок", "ребёнок", "дети",
+    "жена", "муж", "супруг", "родител", "мама", "папа", "отец", "мать",
+    "брат", "сестр", "бабушк", "дедушк", "семь",
+    "день рождения", "родился", "родилась",
+    "зовут", "имя моего", "имя моей",
+    "мне лет", "моих лет", "я родился", "я родилась",
+    "живу в", "работаю", "моя работа", "моя профессия",
+    "хобби", "увлечени", "люблю делать",
+)
+
+_DECISION_RE = compile_keywords(_DECISION_KEYWORDS)
+_INSIGHT_RE = compile_keywords(_INSIGHT_KEYWORDS)
+_PERSONAL_RE = compile_keywords(_PERSONAL_KEYWORDS)
+
+
 class CoreAgent(BaseAgent):
     """
     Core Agent — главный диалоговый агент.
@@ -131,48 +168,12 @@ class CoreAgent(BaseAgent):
         """
         combined = (user_message + " " + response).lower()
         
-        # Decision indicators
-        decision_keywords = [
-            "решил", "решение", "решаю",
-            "принимаю", "принял решение",
-            "выбираю", "выбор сделан",
-            "буду делать", "будем делать",
-            "утверждаю", "одобряю",
-            "цель", "моя цель", "жизненная цель",
-        ]
-        
-        # Insight/Fact indicators
-        insight_keywords = [
-            "понял", "осознал", "вывод",
-            "инсайт", "понимаю теперь",
-            "ключевой момент", "важно что",
-            "принцип", "мое правило", "убеждение",
-            "ценность", "идеал", "миссия",
-        ]
-        
-        # Personal/Family facts - ВСЕГДА сохраняем!
-        personal_keywords = [
-            "внук", "внучк", "сын", "дочь", "дочер", "ребенок", "ребёнок", "дети",
-            "жена", "муж", "супруг", "родител", "мама", "папа", "отец", "мать",
-            "брат", "сестр", "бабушк", "дедушк", "семь",
-            "день рождения", "родился", "родилась",
-            "зовут", "имя моего", "имя моей",
-            "мне лет", "моих лет", "я родился", "я родилась",
-            "живу в", "работаю", "моя работа", "моя профессия",
-            "хобби", "увлечени", "люблю делать",
-        ]
-        
-        for keyword in decision_keywords:
-            if keyword in combined:
-                return True, "decision"
-        
-        for keyword in insight_keywords:
-            if keyword in combined:
-                return True, "insight"
-        
-        for keyword in personal_keywords:
-            if keyword in combined:
-                return True, "fact"  # Сохраняем как факт
+        if _DECISION_RE.search(combined):
+            return True, "decision"
+        if _INSIGHT_RE.search(combined):
+            return True, "insight"
+        if _PERSONAL_RE.search(combined):
+            return True, "fact"  # Сохраняем как факт
         
         return False, None
 
@@ -8,10 +8,20 @@ Agent for converting ideas and decisions into actionable plans.
 from typing import Optional, List, Dict, Any
 
 from agents.base import BaseAgent, AgentContext, AgentResponse
+from core.keywords import compile_keywords
 from llm.openrouter import openrouter
 from llm.base import LLMMessage
 
 
+_PLAN_INDICATORS_RE = compile_keywords((
+    "- [ ]",  # Checklist
+    "| этап |", "| шаг |",  # Table
+    "1. **", "## шаг 1", "## этап 1",  # Numbered steps
+    "план:", "план действий",
+    "чеклист:", "checklist:",
+))
+
+
 class OperatorAgent(BaseAgent):
     """
     Operator Agent — операционный агент.
@@ -134,16 +144,7 @@ class OperatorAgent(BaseAgent):
     
     def _is_actionable_plan(self, response: str) -> bool:
         """Check if response contains actionable plan."""
-        plan_indicators = [
-            "- [ ]",  # Checklist
-            "| этап |", "| шаг |",  # Table
-            "1. **", "## шаг 1", "## этап 1",  # Numbered steps
-            "план:", "план действий",
-            "чеклист:", "checklist:",
-        ]
-        
-        response_lower = response.lower()
-        return any(indicator in response_lower for indicator in plan_indicators)
+        return _PLAN_INDICATORS_RE.search(response.lower()) is not None
 
 
 # Global instance
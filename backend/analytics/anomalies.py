@@ -12,6 +12,7 @@ from datetime import datetime, timedelta, date
 from dataclasses import dataclass, field
 from enum import Enum
 
+import numpy as np
 from sqlalchemy import select, func, and_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -323,41 +324,55 @@ class AnomalyDetector:
         """Check for topic-related anomalies."""
         anomalies = []
         
-        for topic_id, current_freq in current.topic_frequencies.items():
-            baseline_freq = baseline.topic_frequencies.get(topic_id, 0)
+        topic_ids = list(current.topic_frequencies)
+        if not topic_ids:
+            return anomalies
+        
+        # Vectorized over topics: expected (normalized baseline) vs current
+        n = len(topic_ids)
+        norm_factor = current.period_days / baseline.period_days
+        current_freq = np.fromiter(current.topic_frequencies.values(), dtype=np.float64, count=n)
+        baseline_freq = np.fromiter(
+            (baseline.topic_frequencies.get(topic_id, 0) for topic_id in topic_ids),
+            dtype=np.float64,
+            count=n,
+        )
+        expected = baseline_freq * norm_factor
+        known = (baseline_freq > 0) & (expected > 0)
+        change = np.divide(
+            current_freq - expected, expected,
+            out=np.zeros(n), where=known,
+        )
+        spike = known & (change > self.thresholds["topic_spike"])
+        drop = known & (change < -self.thresholds["topic_drop"])
+        
+        expected_values = expected.tolist()
+        change_values = change.tolist()
+        for i in np.flatnonzero(spike | drop).tolist():
+            topic_id = topic_ids[i]
             topic_name = baseline.topic_names.get(topic_id, "Unknown")
+            change_i = change_values[i]
+            
+            if spike[i]:
+                anomaly_type = AnomalyType.TOPIC_SPIKE
+                title = f"Всплеск активности: {topic_name}"
+                description = f"Тема '{topic_name}' показала рост на {change_i*100:.0f}%"
+            else:
+                anomaly_type = AnomalyType.TOPIC_DISAPPEARANCE
+                title = f"Снижение активности: {topic_name}"
+                description = f"Тема '{topic_name}' упала на {abs(change_i)*100:.0f}%"
             
-            if baseline_freq > 0:
-                # Normalize to same period
-                norm_factor = current.period_days / baseline.period_days
-                expected = baseline_freq * norm_factor
-                change = (current_freq - expected) / expected if expected > 0 else 0
-                
-                if change > self.thresholds["topic_spike"]:
-                    anomalies.append(Anomaly(
-                        anomaly_type=AnomalyType.TOPIC_SPIKE,
-                        severity=SEVERITY_MAP[AnomalyType.TOPIC_SPIKE],
-                        title=f"Всплеск активности: {topic_name}",
-                        description=f"Тема '{topic_name}' показала рост на {change*100:.0f}%",
-                        topic_id=topic_id,
-                        topic_name=topic_name,
-                        baseline_value=expected,
-                        current_value=current_freq,
-                        deviation_percent=change * 100,
-                    ))
-                
-                elif change < -self.thresholds["topic_drop"]:
-                    anomalies.append(Anomaly(
-                        anomaly_type=AnomalyType.TOPIC_DISAPPEARANCE,
-                        severity=SEVERITY_MAP[AnomalyType.TOPIC_DISAPPEARANCE],
-                        title=f"Снижение активности: {topic_name}",
-                        description=f"Тема '{topic_name}' упала на {abs(change)*100:.0f}%",
-                        topic_id=topic_id,
-                        topic_name=topic_name,
-                        baseline_value=expected,
-                        current_value=current_freq,
-                        deviation_percent=change * 100,
-                    ))
+            anomalies.append(Anomaly(
+                anomaly_type=anomaly_type,
+                severity=SEVERITY_MAP[anomaly_type],
+                title=title,
+                description=description,
+                topic_id=topic_id,
+                topic_name=topic_name,
+                baseline_value=expected_values[i],
+                current_value=current.topic_frequencies[topic_id],
+                deviation_percent=change_i * 100,
+            ))
         
         return anomalies
     
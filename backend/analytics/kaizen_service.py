@@ -391,6 +391,7 @@ class KaizenEngine:
                 "state": UserState.PLATEAU.value,
                 "confidence": 0.5,
                 "contours": self._get_default_contours(),
+                "up_trend_count": 0,
                 "recommendations": {
                     "behavior_mode": "strategist",
                     "thinking_depth": "structured",
@@ -401,6 +402,14 @@ class KaizenEngine:
         # Determine AI recommendations based on state
         recommendations = self._get_ai_recommendations(snapshot)
         
+        # Materialized once here so behavior selection never rescans contours
+        up_trend_count = [
+            snapshot.cognitive_trend,
+            snapshot.decision_trend,
+            snapshot.management_trend,
+            snapshot.stability_trend,
+        ].count(TrendDirection.UP.value)
+        
         return {
             "state": snapshot.user_state,
             "confidence": 0.8,  # Based on data availability
@@ -411,6 +420,7 @@ class KaizenEngine:
                 "management": {"score": snapshot.management_score, "trend": snapshot.management_trend},
                 "stability": {"score": snapshot.stability_score, "trend": snapshot.stability_trend},
             },
+            "up_trend_count": up_trend_count,
             "recommendations": recommendations,
         }
     
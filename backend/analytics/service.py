@@ -14,6 +14,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from memory.models import MemoryItem, Topic, MemoryTopic
 from analytics.topics import topic_statistics
 
+HEATMAP_DAYS = 365
+
 class AnalyticsService:
     """
     Calculates metrics for personal dashboard.
@@ -30,16 +32,7 @@ class AnalyticsService:
         """
         since = datetime.utcnow() - timedelta(days=days)
         
-        # 1. Total counts
-        total_stmt = (
-            select(func.count(MemoryItem.id))
-            .where(MemoryItem.user_id == user_id)
-            .where(MemoryItem.status == 'active')
-            .where(MemoryItem.created_at >= since)
-        )
-        total = await db.scalar(total_stmt) or 0
-        
-        # 2. Breakdown by type
+        # 1. Breakdown by type (total is its sum — no separate COUNT query)
         type_stmt = (
             select(MemoryItem.item_type, func.count(MemoryItem.id))
             .where(MemoryItem.user_id == user_id)
@@ -49,13 +42,83 @@ class AnalyticsService:
         )
         type_res = await db.execute(type_stmt)
         by_type = {row[0]: row[1] for row in type_res.fetchall()}
+        total = sum(by_type.values())
         
-        # 3. Top topics (reusing existing topic_statistics)
+        # 2. Top topics (reusing existing topic_statistics)
         top_topics = await topic_statistics.get_top_topics(db, days=days, user_id=user_id, limit=5)
         
-        # 4. Activity streak (simplified)
+        # 3. Activity streak (simplified)
         streak = await self._calculate_streak(db, user_id)
         
+        return self._summary_payload(total, by_type, top_topics, streak, days)
+    
+    async def get_dashboard(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        days: int = 30,
+        activity_days: int = 7
+    ) -> Dict[str, Any]:
+        """
+        Get summary, activity timeline and heatmap in one pass.
+        
+        A single aggregate over the heatmap year (per day and type, with
+        FILTERed counts for the shorter windows) replaces the separate
+        summary/activity/heatmap/streak queries; top topics is the only
+        other query.
+        """
+        now = datetime.utcnow()
+        since_summary = now - timedelta(days=days)
+        since_activity = now - timedelta(days=activity_days)
+        
+        day = func.date(MemoryItem.created_at).label('date')
+        stmt = (
+            select(
+                day,
+                MemoryItem.item_type,
+                func.count(MemoryItem.id),
+                func.count(MemoryItem.id).filter(MemoryItem.created_at >= since_summary),
+                func.count(MemoryItem.id).filter(MemoryItem.created_at >= since_activity),
+            )
+            .where(MemoryItem.user_id == user_id)
+            .where(MemoryItem.status == 'active')
+            .where(MemoryItem.created_at >= now - timedelta(days=HEATMAP_DAYS))
+            .group_by(day, MemoryItem.item_type)
+            .order_by(text('date'))
+        )
+        result = await db.execute(stmt)
+        
+        heatmap: Dict[Any, int] = {}
+        activity: Dict[Any, int] = {}
+        by_type: Dict[str, int] = {}
+        for date, item_type, n_all, n_summary, n_activity in result.fetchall():
+            heatmap[date] = heatmap.get(date, 0) + n_all
+            if n_activity:
+                activity[date] = activity.get(date, 0) + n_activity
+            if n_summary:
+                by_type[item_type] = by_type.get(item_type, 0) + n_summary
+        
+        top_topics = await topic_statistics.get_top_topics(db, days=days, user_id=user_id, limit=5)
+        # A streak has to end today or yesterday, so the heatmap year covers
+        # the same 30 most recent active days _calculate_streak looks at
+        streak = self._streak_from_dates(sorted(heatmap, reverse=True)[:30])
+        
+        return {
+            "summary": self._summary_payload(
+                sum(by_type.values()), by_type, top_topics, streak, days
+            ),
+            "activity": [{"date": str(d), "count": n} for d, n in activity.items()],
+            "heatmap": [{"date": str(d), "count": n} for d, n in heatmap.items()],
+        }
+    
+    @staticmethod
+    def _summary_payload(
+        total: int,
+        by_type: Dict[str, int],
+        top_topics: list,
+        streak: int,
+        days: int
+    ) -> Dict[str, Any]:
         return {
             "total_memories": total,
             "by_type": by_type,
@@ -98,7 +161,7 @@ class AnalyticsService:
         """
         Get 365 days of activity for heatmaps.
         """
-        return await self.get_activity_timeline(db, user_id, days=365)
+        return await self.get_activity_timeline(db, user_id, days=HEATMAP_DAYS)
 
     async def _calculate_streak(self, db: AsyncSession, user_id: UUID) -> int:
         """
@@ -115,8 +178,11 @@ class AnalyticsService:
         )
         
         result = await db.execute(stmt)
-        dates = [row[0] for row in result.fetchall()]
-        
+        return self._streak_from_dates([row[0] for row in result.fetchall()])
+    
+    @staticmethod
+    def _streak_from_dates(dates: list) -> int:
+        """Length of the run of consecutive days in `dates` (newest first)."""
         if not dates:
             return 0
             
@@ -5,12 +5,14 @@ Digital Den — Topic Orchestrator
 Orchestrates clustering, naming, and topic creation.
 """
 
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Dict, Any
 from uuid import UUID, uuid4
 import slugify
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import settings
 from memory.models import Topic, MemoryTopic, MemoryItem
 from analytics.clustering import clustering_service
 from analytics.topic_generator import topic_naming_service
@@ -20,18 +22,75 @@ class TopicOrchestrator:
     Ties together clustering and naming to create/update auto-generated topics.
     """
     
+    async def should_recluster(self, db: AsyncSession, user_id: UUID) -> bool:
+        """
+        Whether a new clustering run is worth it.
+        
+        The last run time is the newest auto-generated topic update; a rerun
+        needs both the configured interval and enough new memories since.
+        """
+        last_run = await db.scalar(
+            select(func.max(Topic.updated_at))
+            .where(Topic.user_id == user_id)
+            .where(Topic.is_auto_generated == True)
+        )
+        if last_run is None:
+            return True
+        
+        interval = timedelta(hours=settings.topic_recluster_interval_hours)
+        if datetime.now(timezone.utc) - last_run < interval:
+            return False
+        
+        added = await db.scalar(
+            select(func.count(MemoryItem.id))
+            .where(MemoryItem.user_id == user_id)
+            .where(MemoryItem.status == 'active')
+            .where(MemoryItem.created_at > last_run)
+        )
+        return (added or 0) >= settings.topic_recluster_min_new_memories
+    
+    async def get_cached_topics(self, db: AsyncSession, user_id: UUID) -> Dict[str, Any]:
+        """Auto-generated topics from previous runs, in run_auto_clustering's result shape."""
+        stmt = (
+            select(Topic.id, Topic.name, Topic.cluster_id, func.count(MemoryTopic.memory_id))
+            .outerjoin(MemoryTopic, MemoryTopic.topic_id == Topic.id)
+            .where(Topic.user_id == user_id)
+            .where(Topic.is_auto_generated == True)
+            .where(Topic.is_active == True)
+            .group_by(Topic.id)
+            .order_by(Topic.updated_at.desc())
+        )
+        rows = (await db.execute(stmt)).all()
+        return {
+            "status": "cached",
+            "run_id": rows[0][2] if rows else None,
+            "topics_created": 0,
+            "details": [
+                {"topic_id": topic_id, "name": name, "count": count}
+                for topic_id, name, _, count in rows
+            ]
+        }
+    
     async def run_auto_clustering(
         self, 
         db: AsyncSession, 
         user_id: UUID,
-        run_id: Optional[str] = None
+        run_id: Optional[str] = None,
+        only_if_stale: bool = False
     ) -> Dict[str, Any]:
         """
         1. Find clusters
         2. Name them
         3. Create/Update topics
         4. Link memories
+        
+        `only_if_stale` is for automatic/scheduled callers: the cached topics
+        are returned while should_recluster says the previous run is fresh.
+        Explicit user triggers always re-cluster.
         """
+        if only_if_stale and not await self.should_recluster(db, user_id):
+            return await self.get_cached_topics(db, user_id)
+        
         run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M")
         
         # 1. Cluster discovery
@@ -114,5 +173,4 @@ class TopicOrchestrator:
             "details": results
         }
 
-from datetime import datetime
 topic_orchestrator = TopicOrchestrator()
@@ -44,6 +44,16 @@ async def get_heatmap_data(
     """Get yearly activity for heatmap visualization."""
     return await analytics_service.get_heatmap_data(db, user_id)
 
+@router.get("/dashboard")
+async def get_dashboard_data(
+    user_id: UUID,
+    days: int = Query(30, ge=1, le=365),
+    activity_days: int = Query(7, ge=1, le=365),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get summary, activity and heatmap data in one request."""
+    return await analytics_service.get_dashboard(db, user_id, days=days, activity_days=activity_days)
+
 @router.get("/trends")
 async def get_topic_trends(
     user_id: UUID,
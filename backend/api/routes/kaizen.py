@@ -82,6 +82,7 @@ class UserStateForAIResponse(BaseModel):
     confidence: float
     kaizen_index: Optional[float] = None
     contours: dict
+    up_trend_count: int = 0
     recommendations: dict
 
 
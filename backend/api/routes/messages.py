@@ -146,17 +146,10 @@ async def send_message(
             llm_response = await core_agent.process(agent_context)
         
         # Save to short-term memory
-        await short_term_memory.add_message(
-            session_id=conversation_id,
-            role="user",
-            content=request.content
-        )
-        await short_term_memory.add_message(
-            session_id=conversation_id,
-            role="assistant",
-            content=llm_response.content,
-            agent=llm_response.agent
-        )
+        await short_term_memory.add_messages(conversation_id, [
+            ("user", request.content, None),
+            ("assistant", llm_response.content, llm_response.agent),
+        ])
         
         # Save to long-term memory if important
         if llm_response.save_to_memory:
@@ -378,17 +371,10 @@ async def send_telegram_message(
         
         # Save to short-term memory
         print(f"DEBUG: Saving to Redis with chat_id={chat_id}")  # DEBUG
-        await short_term_memory.add_message(
-            session_id=chat_id,
-            role="user",
-            content=request.content
-        )
-        await short_term_memory.add_message(
-            session_id=chat_id,
-            role="assistant",
-            content=llm_response.content,
-            agent=llm_response.agent
-        )
+        await short_term_memory.add_messages(chat_id, [
+            ("user", request.content, None),
+            ("assistant", llm_response.content, llm_response.agent),
+        ])
         
         # Save to long-term memory if important
         if llm_response.save_to_memory:
@@ -443,17 +429,10 @@ async def send_telegram_message(
             
             # Save to short-term memory (FALLBACK PATH)
             print(f"DEBUG FALLBACK: Saving to Redis with chat_id={chat_id}")
-            await short_term_memory.add_message(
-                session_id=chat_id,
-                role="user",
-                content=request.content
-            )
-            await short_term_memory.add_message(
-                session_id=chat_id,
-                role="assistant",
-                content=response.content,
-                agent=response.agent
-            )
+            await short_term_memory.add_messages(chat_id, [
+                ("user", request.content, None),
+                ("assistant", response.content, response.agent),
+            ])
             
             # Commit any changes from fallback (or previous steps)
             await db.commit()
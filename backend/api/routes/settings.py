@@ -17,6 +17,7 @@ from db.database import get_db
 from memory.models import UserSettings, User
 from analytics.cal_models import Rule
 from core.auth import get_current_user_optional
+from orchestrator.user_settings import invalidate_user_settings
 
 
 router = APIRouter(tags=["Settings"])
@@ -261,6 +262,7 @@ async def update_settings(
     settings.analytics_aggressiveness = data.analytics.analytics_aggressiveness
     
     await db.commit()
+    await invalidate_user_settings(current_user.id)
     await db.refresh(settings)
     
     return settings_to_response(settings)
@@ -281,6 +283,7 @@ async def update_behavior_settings(
     settings.confrontation_level = data.confrontation_level
     
     await db.commit()
+    await invalidate_user_settings(current_user.id)
     await db.refresh(settings)
     
     return {"status": "updated", "behavior": data.model_dump()}
@@ -300,6 +303,7 @@ async def update_autonomy_settings(
     settings.allowed_actions = data.allowed_actions
     
     await db.commit()
+    await invalidate_user_settings(current_user.id)
     await db.refresh(settings)
     
     return {"status": "updated", "autonomy": data.model_dump()}
@@ -320,6 +324,7 @@ async def update_memory_settings(
     settings.saved_types = data.saved_types
     
     await db.commit()
+    await invalidate_user_settings(current_user.id)
     await db.refresh(settings)
     
     return {"status": "updated", "memory": data.model_dump()}
@@ -442,6 +447,7 @@ async def create_rule(
     
     db.add(rule)
     await db.commit()
+    await invalidate_user_settings(current_user.id)
     await db.refresh(rule)
     
     return rule_to_response(rule)
@@ -502,6 +508,7 @@ async def update_rule(
         rule.sort_order = data.sort_order
     
     await db.commit()
+    await invalidate_user_settings(current_user.id)
     await db.refresh(rule)
     
     return rule_to_response(rule)
@@ -527,6 +534,7 @@ async def delete_rule(
     
     await db.delete(rule)
     await db.commit()
+    await invalidate_user_settings(current_user.id)
     
     return {"status": "deleted", "id": rule_id}
 
@@ -551,6 +559,7 @@ async def toggle_rule(
     
     rule.is_active = not rule.is_active
     await db.commit()
+    await invalidate_user_settings(current_user.id)
     
     return {"status": "toggled", "id": rule_id, "is_active": rule.is_active}
 
@@ -571,7 +580,7 @@ async def get_explain_mode(
     """Get current explain mode setting."""
     settings = await get_or_create_settings(db, current_user.id)
     return {
-        "explain_mode": getattr(settings, 'explain_mode', 'off') or 'off',
+        "explain_mode": settings.explain_mode or 'off',
         "options": ["off", "brief", "detailed"],
         "descriptions": {
             "off": "Режим объяснения выключен",
@@ -594,6 +603,7 @@ async def update_explain_mode(
     settings = await get_or_create_settings(db, current_user.id)
     settings.explain_mode = data.mode
     await db.commit()
+    await invalidate_user_settings(current_user.id)
     
     return {
         "status": "updated",
@@ -614,12 +624,13 @@ async def toggle_explain_mode(
     """Cycle through explain modes: off -> brief -> detailed -> off."""
     settings = await get_or_create_settings(db, current_user.id)
     
-    current = getattr(settings, 'explain_mode', 'off') or 'off'
+    current = settings.explain_mode or 'off'
     cycle = {"off": "brief", "brief": "detailed", "detailed": "off"}
     new_mode = cycle.get(current, "off")
     
     settings.explain_mode = new_mode
     await db.commit()
+    await invalidate_user_settings(current_user.id)
     
     return {
         "status": "toggled",
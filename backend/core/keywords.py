@@ -0,0 +1,14 @@
+"""
+Digital Den — Keyword Patterns
+═══════════════════════════════════════════════════════════════════════════
+
+Shared keyword matching for the orchestrator and agents.
+"""
+
+import re
+from typing import Iterable, Pattern
+
+
+def compile_keywords(keywords: Iterable[str]) -> Pattern[str]:
+    """Compile substring markers into one alternation (single pass over text)."""
+    return re.compile("|".join(map(re.escape, keywords)))
@@ -14,6 +14,11 @@ from typing import Any, Dict
 from core.config import settings
 
 
+# Minimum level passed by structlog's filtering logger and stdlib logging,
+# from settings.log_level (unknown names fall back to INFO)
+LOG_LEVEL = logging.getLevelNamesMapping().get(settings.log_level.upper(), logging.INFO)
+
+
 def configure_logging() -> None:
     """Configure structlog and standard logging."""
     
@@ -41,7 +46,7 @@ def configure_logging() -> None:
     structlog.configure(
         processors=processors,
         logger_factory=structlog.PrintLoggerFactory(),
-        wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
+        wrapper_class=structlog.make_filtering_bound_logger(LOG_LEVEL),
         cache_logger_on_first_use=True,
     )
 
@@ -49,10 +54,19 @@ def configure_logging() -> None:
     logging.basicConfig(
         format="%(message)s",
         stream=sys.stdout,
-        level=logging.INFO,
+        level=LOG_LEVEL,
     )
 
 
 def get_logger(name: str = None) -> structlog.stdlib.BoundLogger:
     """Get a structured logger."""
     return structlog.get_logger(name)
+
+
+def is_enabled_for(level: int) -> bool:
+    """
+    Check whether log calls at `level` are emitted.
+    
+    Lets hot paths skip building log arguments that would be filtered out.
+    """
+    return level >= LOG_LEVEL
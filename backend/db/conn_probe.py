@@ -0,0 +1,16 @@
+"""
+Digital Den — Database Probe
+═══════════════════════════════════════════════════════════════════════════
+
+Connectivity check over the application's pooled async engine.
+"""
+
+from sqlalchemy import text
+
+from db.database import engine
+
+
+async def probe() -> int:
+    """Run `SELECT 1` on a pooled connection."""
+    async with engine.connect() as conn:
+        return await conn.scalar(text("SELECT 1"))
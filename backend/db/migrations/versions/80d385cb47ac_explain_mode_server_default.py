@@ -0,0 +1,39 @@
+"""explain_mode_server_default
+
+Revision ID: 80d385cb47ac
+Revises: f911a7b47032
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '80d385cb47ac'
+down_revision: Union[str, Sequence[str], None] = 'f911a7b47032'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("UPDATE user_settings SET explain_mode = 'off' WHERE explain_mode IS NULL")
+    op.alter_column(
+        'user_settings',
+        'explain_mode',
+        existing_type=sa.String(length=20),
+        server_default='off',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        'user_settings',
+        'explain_mode',
+        existing_type=sa.String(length=20),
+        server_default=None,
+    )
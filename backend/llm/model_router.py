@@ -22,6 +22,7 @@ from enum import Enum
 from core.config import settings
 from core.logging import get_logger
 from llm.llm_selector import llm_selector, ModelRole
+from llm.reply_cache import ReplyCache
 
 logger = get_logger(__name__)
 
@@ -51,7 +52,8 @@ class ModelRouter:
     
     Принцип работы:
     1. Быстрая проверка по ключевым словам (бесплатно)
-    2. При неуверенности — классификация через GPT-4o-mini (дёшево)
+    2. При неуверенности — классификация через GPT-4o-mini (дёшево),
+       ответы кэшируются по нормализованному сообщению
     3. Возврат категории и рекомендуемой роли модели
     """
     
@@ -89,14 +91,25 @@ class ModelRouter:
         "анализ данных", "отчёт", "сравни", "процент",
     ]
     
-    async def classify(self, message: str) -> tuple[TaskCategory, ModelRole, float]:
+    def __init__(self):
+        # Повторные сообщения не идут в LLM повторно
+        self._cache = ReplyCache(maxsize=settings.intent_cache_size)
+    
+    async def classify(
+        self,
+        message: str,
+        message_lower: Optional[str] = None,
+    ) -> tuple[TaskCategory, ModelRole, float]:
         """
         Классифицировать запрос и определить оптимальную модель.
         
+        message_lower — message.lower(), если уже посчитан вызывающим.
+        
         Returns:
             (category, model_role, confidence)
         """
-        message_lower = message.lower()
+        if message_lower is None:
+            message_lower = message.lower()
         
         # 1. Быстрая проверка по ключевым словам
         quick_result = self._quick_classify(message_lower)
@@ -171,22 +184,31 @@ class ModelRouter:
 
 ТОЛЬКО JSON:"""
 
+        cache_key = self._cache.normalize(message)
+        
         try:
-            response = await llm_selector.complete_simple(
-                role=ModelRole.ROUTER,
-                prompt=prompt,
-            )
-            
-            # Парсинг JSON
-            content = response.strip()
-            if content.startswith("```"):
-                content = re.sub(r"```(?:json)?\n?", "", content).strip()
+            content = self._cache.get(cache_key)
+            cached = content is not None
+            if not cached:
+                response = await llm_selector.complete_simple(
+                    role=ModelRole.ROUTER,
+                    prompt=prompt,
+                )
+                
+                # Парсинг JSON
+                content = response.strip()
+                if content.startswith("```"):
+                    content = re.sub(r"```(?:json)?\n?", "", content).strip()
             
             data = json.loads(content)
             category = TaskCategory(data.get("category", "routine"))
             confidence = float(data.get("confidence", 0.7))
             role = CATEGORY_TO_ROLE.get(category, ModelRole.DEFAULT)
             
+            # Кэшируем только ответы, которые удалось разобрать
+            if not cached:
+                self._cache.put(cache_key, content)
+            
             return (category, role, confidence)
             
         except (json.JSONDecodeError, ValueError) as e:
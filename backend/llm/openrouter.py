@@ -42,8 +42,14 @@ class OpenRouterProvider(BaseLLMProvider):
         model: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 4096,
+        response_format: Optional[dict] = None,
     ) -> LLMResponse:
-        """Generate completion from messages."""
+        """
+        Generate completion from messages.
+        
+        response_format: OpenAI-style structured output spec,
+        e.g. {"type": "json_schema", "json_schema": {...}}.
+        """
         
         model = model or self.default_model
         
@@ -53,6 +59,8 @@ class OpenRouterProvider(BaseLLMProvider):
             "temperature": temperature,
             "max_tokens": max_tokens,
         }
+        if response_format:
+            payload["response_format"] = response_format
         
         async with httpx.AsyncClient() as client:
             response = await client.post(
@@ -79,6 +87,7 @@ class OpenRouterProvider(BaseLLMProvider):
         prompt: str,
         system: Optional[str] = None,
         model: Optional[str] = None,
+        response_format: Optional[dict] = None,
     ) -> str:
         """Simple completion with just prompt."""
         
@@ -87,7 +96,7 @@ class OpenRouterProvider(BaseLLMProvider):
             messages.append(LLMMessage(role="system", content=system))
         messages.append(LLMMessage(role="user", content=prompt))
         
-        response = await self.complete(messages, model=model)
+        response = await self.complete(messages, model=model, response_format=response_format)
         return response.content
 
     async def get_embedding(self, text: str, model: Optional[str] = None) -> List[float]:
@@ -0,0 +1,93 @@
+"""
+Digital Den — LLM Reply Cache
+═══════════════════════════════════════════════════════════════════════════
+
+In-process cache of LLM replies for repeated / near-duplicate messages
+(IntentAnalyzer, ModelRouter).
+"""
+
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+
+class ReplyCache:
+    """
+    Two-tier cache of LLM classification replies.
+    
+    Stores the cleaned reply text, not parsed objects — callers rebuild
+    their result from it on a hit.
+    
+    1. Exact: normalized message → reply, LRU-bounded.
+    2. Semantic (optional): cosine top-1 over embeddings of recent
+       messages, kept in a fixed-size ring buffer.
+    """
+    
+    def __init__(
+        self,
+        maxsize: int,
+        semantic_size: int = 0,
+        threshold: float = 0.95,
+    ):
+        self.maxsize = maxsize
+        self.semantic_size = semantic_size
+        self.threshold = threshold
+        
+        self._exact: "OrderedDict[str, str]" = OrderedDict()
+        
+        # Semantic tier: unit-normalized rows + replies, filled round-robin
+        self._vectors: Optional[np.ndarray] = None
+        self._replies: List[Optional[str]] = [None] * semantic_size
+        self._filled = 0
+        self._next = 0
+    
+    @property
+    def semantic(self) -> bool:
+        return self.semantic_size > 0
+    
+    @staticmethod
+    def normalize(message: str) -> str:
+        """Cache key: case- and whitespace-insensitive message."""
+        return " ".join(message.lower().split())
+    
+    def get(self, key: str) -> Optional[str]:
+        reply = self._exact.get(key)
+        if reply is not None:
+            self._exact.move_to_end(key)
+        return reply
+    
+    def get_similar(self, vector: np.ndarray) -> Optional[str]:
+        """Closest cached reply if its message is similar enough."""
+        if not self._filled:
+            return None
+        similarities = self._vectors[:self._filled] @ vector
+        best = int(similarities.argmax())
+        if similarities[best] >= self.threshold:
+            return self._replies[best]
+        return None
+    
+    def put(
+        self,
+        key: str,
+        reply: str,
+        vector: Optional[np.ndarray] = None,
+    ) -> None:
+        self._exact[key] = reply
+        self._exact.move_to_end(key)
+        if len(self._exact) > self.maxsize:
+            self._exact.popitem(last=False)
+        
+        if vector is not None and self.semantic:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.semantic_size, vector.shape[0]), dtype=np.float32)
+            self._vectors[self._next] = vector
+            self._replies[self._next] = reply
+            self._next = (self._next + 1) % self.semantic_size
+            self._filled = min(self._filled + 1, self.semantic_size)
+    
+    @staticmethod
+    def as_unit_vector(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
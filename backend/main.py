@@ -10,6 +10,7 @@ from datetime import datetime
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from prometheus_client import make_asgi_app
 import time
 
@@ -76,6 +77,8 @@ app = FastAPI(
     description="Personal Cognitive Operating System",
     version="0.1.0",
     lifespan=lifespan,
+    # orjson serializes route return values; explicit Response objects are untouched
+    default_response_class=ORJSONResponse,
 )
 
 
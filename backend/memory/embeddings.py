@@ -12,6 +12,7 @@ from typing import List, Optional, Dict, Any
 from uuid import UUID
 
 from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from memory.models import MemoryItem, MemoryEmbedding
@@ -25,7 +26,7 @@ class EmbeddingService:
     Service for generating and managing embeddings for memory items.
     """
     
-    def __init__(self, batch_size: int = 20):
+    def __init__(self, batch_size: int = 100):
         self.batch_size = batch_size
         self.model = "openai/text-embedding-ada-002"
 
@@ -86,30 +87,25 @@ class EmbeddingService:
         # 3. Generate embeddings
         embeddings = await self.generate_embeddings_batch(texts)
         
-        # 4. Store in database
-        indexed_count = 0
-        for i, item in enumerate(items):
-            if i >= len(embeddings): break
-            
-            # Upsert logic
-            stmt = select(MemoryEmbedding).where(MemoryEmbedding.memory_id == item.id)
-            res = await db.execute(stmt)
-            existing = res.scalar_one_or_none()
-            
-            if existing:
-                existing.embedding = embeddings[i]
-                existing.model = self.model
-            else:
-                new_emb = MemoryEmbedding(
-                    memory_id=item.id,
-                    embedding=embeddings[i],
-                    model=self.model
-                )
-                db.add(new_emb)
-            indexed_count += 1
-            
+        # 4. Store in database — one multi-row upsert for the whole batch
+        rows = [
+            {"memory_id": item.id, "embedding": embedding, "model": self.model}
+            for item, embedding in zip(items, embeddings)
+        ]
+        if not rows:
+            return 0
+        
+        stmt = insert(MemoryEmbedding).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MemoryEmbedding.memory_id],
+            set_={
+                "embedding": stmt.excluded.embedding,
+                "model": stmt.excluded.model,
+            },
+        )
+        await db.execute(stmt)
         await db.flush()
-        return indexed_count
+        return len(rows)
 
     async def cleanup_orphaned(self, db: AsyncSession) -> int:
         """Remove embeddings that don't have a corresponding memory item."""
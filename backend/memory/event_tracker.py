@@ -6,9 +6,9 @@ Digital Den — Memory Event Tracking Service
 """
 
 from typing import List, Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import update
+from sqlalchemy import insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from memory.models import MemoryItem, MemoryEvent
@@ -72,6 +72,42 @@ class MemoryEventTracker:
         await db.execute(stmt)
         await db.flush()
     
+    async def log_and_increment(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        memory_ids: List[UUID],
+        event_type: str = "recalled",
+        outcome: Optional[str] = None,
+        context: Optional[str] = None
+    ):
+        """
+        log_memory_usage + increment_usage_count одним запросом.
+        
+        INSERT событий идёт data-modifying CTE к UPDATE счётчиков:
+        один round-trip к БД вместо flush + UPDATE + flush.
+        """
+        events = insert(MemoryEvent).values([
+            {
+                "id": uuid4(),
+                "memory_id": memory_id,
+                "user_id": user_id,
+                "event_type": event_type,
+                "outcome": outcome,
+                "context": context,
+            }
+            for memory_id in memory_ids
+        ]).cte("events")
+        
+        stmt = (
+            update(MemoryItem)
+            .where(MemoryItem.id.in_(memory_ids))
+            .values(usage_count=MemoryItem.usage_count + 1)
+            .add_cte(events)
+        )
+        
+        await db.execute(stmt)
+    
     async def record_outcome(
         self,
         db: AsyncSession,
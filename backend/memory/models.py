@@ -11,7 +11,7 @@ from typing import Optional, List
 
 from sqlalchemy import (
     Column, String, Text, Float, Boolean, DateTime, ForeignKey,
-    Integer, JSON, ARRAY, Index, create_engine
+    Integer, JSON, ARRAY, Index, UniqueConstraint, create_engine
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
@@ -134,6 +134,23 @@ class MemoryItem(Base):
         Index("idx_memory_items_created", "created_at"),
     )
     
+    # Length of the content preview used in conflict listings
+    CONTENT_PREVIEW_LENGTH = 100
+    
+    @property
+    def content_preview(self) -> str:
+        """
+        Truncated content, kept on the instance until content changes.
+        
+        Not a column: content is encrypted at rest, a stored preview would not be.
+        """
+        content = self.content or ""
+        cached = self.__dict__.get("_content_preview")
+        if cached is None or cached[0] is not content:
+            cached = (content, content[:self.CONTENT_PREVIEW_LENGTH])
+            self._content_preview = cached
+        return cached[1]
+    
     def __repr__(self):
         return f"<MemoryItem {self.item_type}: {self.content[:50]}...>"
 
@@ -252,6 +269,8 @@ class ConversationState(Base):
         Index("idx_conversation_states_user", "user_id"),
         Index("idx_conversation_states_conv_id", "conversation_id"),
         Index("idx_conversation_states_updated", "last_updated"),
+        # Target of conversation_state_repo.upsert (ON CONFLICT ON CONSTRAINT)
+        UniqueConstraint("user_id", "conversation_id", name="uq_user_conversation"),
     )
     
     def to_dict(self):
@@ -557,7 +576,7 @@ class UserSettings(Base):
     
     # Explain Mode: off, brief, detailed
     # When enabled, AI explains its reasoning in responses
-    explain_mode = Column(String(20), default="off")
+    explain_mode = Column(String(20), default="off", server_default="off")
     
     # ═══════════════════════════════════════════════════════════════════════
     # Kaizen Engine Settings
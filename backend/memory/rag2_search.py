@@ -37,7 +37,8 @@ class RAG2SearchService:
         limit: int = 10,
         vector_weight: float = 0.7,
         keyword_weight: float = 0.3,
-        similarity_threshold: float = 0.5
+        similarity_threshold: float = 0.5,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[Tuple[MemoryItem, float]]:
         """
         RAG 2.0 intent-aware hybrid search.
@@ -52,22 +53,17 @@ class RAG2SearchService:
             vector_weight: Weight for semantic similarity
             keyword_weight: Weight for keyword matching
             similarity_threshold: Minimum similarity threshold
+            query_embedding: Готовый embedding расширенного запроса
+                (см. embed_query) — если вызывающий посчитал его заранее
             
         Returns:
             List of (MemoryItem, final_score) sorted by relevance
         """
-        # 1. Query expansion через active_entities из conversation_state
-        expanded_query = query
-        if conversation_state and conversation_state.active_entities:
-            # Добавляем активные сущности к запросу
-            entities_str = " ".join(conversation_state.active_entities[:3])  # топ-3
-            expanded_query = f"{query} {entities_str}"
-        
-        # 2. Получение embedding
-        try:
-            query_embedding = await openrouter.get_embedding(expanded_query)
-        except Exception as e:
-            print(f"Embedding error: {e}, falling back to keyword search")
+        # 1-2. Query expansion + embedding (если не передан)
+        if query_embedding is None:
+            active_entities = conversation_state.active_entities if conversation_state else None
+            query_embedding = await self.embed_query(query, active_entities)
+        if query_embedding is None:
             return await self._keyword_search_fallback(db, query, user_id, limit)
         
         # 3. Векторный поиск с метаданными
@@ -112,6 +108,29 @@ class RAG2SearchService:
         scored_results.sort(key=lambda x: x[1], reverse=True)
         return scored_results[:limit]
     
+    @staticmethod
+    def expand_query(query: str, active_entities: Optional[List[str]]) -> str:
+        """Query expansion: добавляем топ-3 активные сущности из conversation state"""
+        if active_entities:
+            return f"{query} {' '.join(active_entities[:3])}"
+        return query
+    
+    async def embed_query(
+        self,
+        query: str,
+        active_entities: Optional[List[str]] = None,
+    ) -> Optional[List[float]]:
+        """
+        Embedding расширенного запроса; None при ошибке (→ keyword fallback).
+        
+        Не трогает БД — можно запускать параллельно с запросами в той же сессии.
+        """
+        try:
+            return await openrouter.get_embedding(self.expand_query(query, active_entities))
+        except Exception as e:
+            print(f"Embedding error: {e}, falling back to keyword search")
+            return None
+    
     async def _execute_vector_search(
         self,
         db: AsyncSession,
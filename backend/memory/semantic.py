@@ -6,6 +6,7 @@ Facade for semantic search and embedding management.
 Integrates embeddings.py and search.py.
 """
 
+import logging
 from typing import List, Optional, Tuple
 from uuid import UUID
 
@@ -15,6 +16,8 @@ from memory.models import MemoryItem
 from memory.embeddings import embedding_service
 from memory.search import search_service
 
+logger = logging.getLogger(__name__)
+
 
 class SemanticMemoryService:
     """
@@ -46,6 +49,12 @@ class SemanticMemoryService:
             print(f"Error indexing memory {memory_id}: {e}")
             return False
     
+    async def index_many(self, db: AsyncSession, memory_ids: List[UUID]) -> int:
+        """
+        Index several memory items with one embeddings call and one upsert.
+        """
+        return await embedding_service.index_items(db, memory_ids)
+    
     async def search(
         self,
         db: AsyncSession,
@@ -119,22 +128,34 @@ class SemanticMemoryService:
             
         return results
     
-    async def reindex_all(self, db: AsyncSession) -> int:
-        """Reindex all active memories."""
+    async def reindex_all(
+        self,
+        db: AsyncSession,
+        batch_size: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> int:
+        """
+        Reindex all active memories.
+        
+        Each batch costs one embeddings API call and one upsert statement.
+        """
         from memory.models import MemoryItem
         from sqlalchemy import select
         
-        result = await db.execute(
-            select(MemoryItem.id).where(MemoryItem.status == 'active')
-        )
-        ids = [row[0] for row in result.fetchall()]
+        batch_size = batch_size or embedding_service.batch_size
+        
+        stmt = select(MemoryItem.id).where(MemoryItem.status == 'active').order_by(MemoryItem.id)
+        if limit:
+            stmt = stmt.limit(limit)
+        result = await db.execute(stmt)
+        ids = result.scalars().all()
         
         # Batch index
         total_indexed = 0
-        batch_size = 20
         for i in range(0, len(ids), batch_size):
             batch_ids = ids[i:i+batch_size]
             total_indexed += await embedding_service.index_items(db, batch_ids)
+            logger.info(f"Reindexed {total_indexed}/{len(ids)} memories")
             
         return total_indexed
 
@@ -6,8 +6,8 @@ Short-term memory operations with Redis.
 """
 
 import json
-from datetime import timedelta
-from typing import Optional, List, Dict, Any
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Tuple
 
 import redis.asyncio as redis
 
@@ -49,26 +49,72 @@ class ShortTermMemory:
     # Session Context
     # ─────────────────────────────────────────────────────────────────────────
     
+    @staticmethod
+    def _session_key(session_id: str) -> str:
+        """
+        Redis key of a session hash.
+        
+        Hash sessions use their own prefix: legacy `session:<id>` keys hold
+        JSON strings (HGETALL on them raises WRONGTYPE) and simply expire.
+        """
+        return f"session:v2:{session_id}"
+    
+    @staticmethod
+    def new_session() -> Dict[str, Any]:
+        """Fields of a freshly started session."""
+        now_iso = datetime.utcnow().isoformat()
+        return {
+            "started_at": now_iso,
+            "last_activity": now_iso,
+            "active_topics": [],
+            "current_mode": "default",
+        }
+    
     async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get session context."""
-        key = f"session:{session_id}"
-        data = await self.redis.get(key)
-        return json.loads(data) if data else None
+        data = await self.redis.hgetall(self._session_key(session_id))
+        return self._decode_fields(data) if data else None
     
     async def set_session(self, session_id: str, data: Dict[str, Any]):
         """Set session context."""
-        key = f"session:{session_id}"
-        await self.redis.setex(
-            key,
-            self.session_ttl,
-            json.dumps(data, ensure_ascii=False),
-        )
+        key = self._session_key(session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            if data:
+                pipe.hset(key, mapping=self._encode_fields(data))
+                pipe.expire(key, self.session_ttl)
+            await pipe.execute()
     
     async def update_session(self, session_id: str, updates: Dict[str, Any]):
-        """Update session context."""
-        current = await self.get_session(session_id) or {}
-        current.update(updates)
-        await self.set_session(session_id, current)
+        """
+        Update session context.
+        
+        Sessions are stored as Redis hashes, so only the changed fields are
+        written — no read-modify-write round-trip. A missing session is
+        seeded with the default fields (HSETNX leaves existing ones alone).
+        """
+        if not updates:
+            return
+        key = self._session_key(session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for field, value in self._encode_fields(self.new_session()).items():
+                pipe.hsetnx(key, field, value)
+            pipe.hset(key, mapping=self._encode_fields(updates))
+            pipe.expire(key, self.session_ttl)
+            await pipe.execute()
+    
+    @staticmethod
+    def _encode_fields(data: Dict[str, Any]) -> Dict[str, str]:
+        """JSON-encode hash field values."""
+        return {
+            field: json.dumps(value, ensure_ascii=False)
+            for field, value in data.items()
+        }
+    
+    @staticmethod
+    def _decode_fields(data: Dict[str, str]) -> Dict[str, Any]:
+        """JSON-decode hash field values."""
+        return {field: json.loads(value) for field, value in data.items()}
     
     # ─────────────────────────────────────────────────────────────────────────
     # Chat History
@@ -84,6 +130,20 @@ class ShortTermMemory:
         data = await self.redis.lrange(key, -limit, -1)
         return [json.loads(msg) for msg in data]
     
+    async def get_session_and_history(
+        self,
+        session_id: str,
+        limit: int = 20
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, str]]]:
+        """Get session context and chat history in a single round-trip."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(self._session_key(session_id))
+            pipe.lrange(f"chat:{session_id}", -limit, -1)
+            session_data, history_data = await pipe.execute()
+        
+        session = self._decode_fields(session_data) if session_data else None
+        return session, [json.loads(msg) for msg in history_data]
+    
     async def add_message(
         self, 
         session_id: str, 
@@ -104,6 +164,33 @@ class ShortTermMemory:
         # Keep only last 200 messages
         await self.redis.ltrim(key, -200, -1)
     
+    async def add_messages(
+        self,
+        session_id: str,
+        messages: List[Tuple[str, str, Optional[str]]],
+    ):
+        """
+        Add several (role, content, agent) messages to chat history.
+        
+        All pushes, the trim and the TTL refresh go out in one pipeline —
+        a single round-trip instead of three per message.
+        """
+        if not messages:
+            return
+        key = f"chat:{session_id}"
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.rpush(key, *(
+                json.dumps(
+                    {"role": role, "content": content, "agent": agent},
+                    ensure_ascii=False,
+                )
+                for role, content, agent in messages
+            ))
+            # Keep only last 200 messages
+            pipe.ltrim(key, -200, -1)
+            pipe.expire(key, int(self.chat_ttl.total_seconds()))
+            await pipe.execute()
+    
     # ─────────────────────────────────────────────────────────────────────────
     # Working Buffer
     # ─────────────────────────────────────────────────────────────────────────
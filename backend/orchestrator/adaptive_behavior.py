@@ -11,12 +11,13 @@ Principle:
 Based on: docs/adaptive_ai_behavior.md, docs/golden_standard_denis.md
 """
 
+import logging
 from enum import Enum
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
 
 from analytics.kaizen_models import UserState
-from core.logging import get_logger
+from core.logging import get_logger, is_enabled_for
 
 
 logger = get_logger(__name__)
@@ -211,28 +212,59 @@ class AdaptiveAIBehavior:
         ),
     }
     
+    # Lookup tables for the per-request dispatch helpers (built once)
+    CLARIFYING_MODES = frozenset({AIBehaviorMode.COACH, AIBehaviorMode.ANALYST})
+    ALTERNATIVES_MODES = frozenset({AIBehaviorMode.STRATEGIST, AIBehaviorMode.EXPLORER})
+    
+    MAX_SENTENCES = {
+        ResponseLength.BRIEF: 5,
+        ResponseLength.MEDIUM: 12,
+        ResponseLength.DETAILED: 25,
+    }
+    
+    MODE_NAMES = {
+        AIBehaviorMode.STRATEGIST: "партнёр-стратег",
+        AIBehaviorMode.ANALYST: "логический аналитик",
+        AIBehaviorMode.COACH: "коуч",
+        AIBehaviorMode.FIXER: "фиксатор",
+        AIBehaviorMode.EXPLORER: "исследователь гипотез",
+    }
+    
     def __init__(self):
         self.current_mode: Optional[AIBehaviorMode] = None
         self.current_state: Optional[UserState] = None
+        
+        # Last adapt_system_prompt inputs/result (state rarely flips between messages)
+        self._last_inputs_key: Optional[tuple] = None
+        self._last_prompt: str = ""
+        
+        # mode → response guidelines (configs are static)
+        self._guidelines: Dict[AIBehaviorMode, Dict[str, Any]] = {}
     
     def select_behavior_mode(
         self,
         user_state: UserState,
-        contours: Optional[Dict[str, Any]] = None
+        contours: Optional[Dict[str, Any]] = None,
+        up_trend_count: Optional[int] = None
     ) -> AIBehaviorMode:
         """
         Select AI behavior mode based on user state.
         
         Can switch to EXPLORER if growth is sustained.
+        Callers that already know how many contours trend up can pass
+        `up_trend_count` to skip scanning `contours`.
         """
         # Check for sustained growth → Explorer mode
-        if user_state == UserState.GROWTH and contours:
-            # If all contours are trending up, use Explorer
-            up_trends = sum(
-                1 for c in contours.values()
-                if isinstance(c, dict) and c.get("trend") == "up"
-            )
-            if up_trends >= 3:
+        if user_state == UserState.GROWTH:
+            if up_trend_count is None and isinstance(contours, dict):
+                # Only the threshold matters, stop counting once it is reached
+                up_trend_count = 0
+                for c in contours.values():
+                    if isinstance(c, dict) and c.get("trend") == "up":
+                        up_trend_count += 1
+                        if up_trend_count >= 3:
+                            break
+            if up_trend_count is not None and up_trend_count >= 3:
                 return AIBehaviorMode.EXPLORER
         
         return self.STATE_TO_MODE.get(user_state, AIBehaviorMode.ANALYST)
@@ -248,15 +280,26 @@ class AdaptiveAIBehavior:
         self,
         base_prompt: str,
         user_state: UserState,
-        contours: Optional[Dict[str, Any]] = None
+        contours: Optional[Dict[str, Any]] = None,
+        up_trend_count: Optional[int] = None
     ) -> str:
         """
         Adapt system prompt based on user's cognitive state.
         
         This is the main integration point with the orchestrator.
+        `up_trend_count` is the precomputed number of rising contours
+        (see KaizenEngine.get_user_state_for_ai); when given, contours
+        are not scanned at all.
+        Repeated calls with the same prompt, state and contour trends
+        return the previous result without re-selecting the mode.
         """
+        trends_key = up_trend_count if up_trend_count is not None else self._contours_key(contours)
+        inputs_key = (base_prompt, user_state, trends_key)
+        if inputs_key == self._last_inputs_key:
+            return self._last_prompt
+        
         # Select mode
-        mode = self.select_behavior_mode(user_state, contours)
+        mode = self.select_behavior_mode(user_state, contours, up_trend_count)
         config = self.get_behavior_config(mode)
         
         # Store current state
@@ -266,15 +309,29 @@ class AdaptiveAIBehavior:
         # Add behavior instructions to prompt
         adapted_prompt = base_prompt + config.prompt_additions
         
-        logger.info(
-            "adaptive_behavior_applied",
-            user_state=user_state.value,
-            mode=mode.value,
-            thinking_depth=config.thinking_depth.value,
-        )
+        if is_enabled_for(logging.INFO):
+            logger.info(
+                "adaptive_behavior_applied",
+                user_state=user_state.value,
+                mode=mode.value,
+                thinking_depth=config.thinking_depth.value,
+            )
         
+        self._last_inputs_key = inputs_key
+        self._last_prompt = adapted_prompt
         return adapted_prompt
     
+    @staticmethod
+    def _contours_key(contours: Optional[Dict[str, Any]]) -> Optional[tuple]:
+        """Cheap fingerprint of contours — only trends affect mode selection."""
+        if not isinstance(contours, dict):
+            return None
+        return tuple(
+            (name, c.get("trend"))
+            for name, c in contours.items()
+            if isinstance(c, dict)
+        )
+    
     def get_response_guidelines(
         self,
         mode: Optional[AIBehaviorMode] = None
@@ -285,25 +342,26 @@ class AdaptiveAIBehavior:
         Used by agents to adapt their output.
         """
         mode = mode or self.current_mode or AIBehaviorMode.ANALYST
-        config = self.get_behavior_config(mode)
+        guidelines = self._guidelines.get(mode)
+        
+        if guidelines is None:
+            config = self.get_behavior_config(mode)
+            guidelines = {
+                "mode": mode.value,
+                "thinking_depth": config.thinking_depth.value,
+                "response_length": config.response_length.value,
+                "focus": config.focus,
+                "forbidden_phrases": config.forbidden_phrases,
+                "allowed_phrases": config.allowed_phrases,
+                "max_sentences": self._get_max_sentences(config.response_length),
+            }
+            self._guidelines[mode] = guidelines
         
-        return {
-            "mode": mode.value,
-            "thinking_depth": config.thinking_depth.value,
-            "response_length": config.response_length.value,
-            "focus": config.focus,
-            "forbidden_phrases": config.forbidden_phrases,
-            "allowed_phrases": config.allowed_phrases,
-            "max_sentences": self._get_max_sentences(config.response_length),
-        }
+        return dict(guidelines)
     
     def _get_max_sentences(self, length: ResponseLength) -> int:
         """Get recommended max sentences based on response length."""
-        return {
-            ResponseLength.BRIEF: 5,
-            ResponseLength.MEDIUM: 12,
-            ResponseLength.DETAILED: 25,
-        }.get(length, 12)
+        return self.MAX_SENTENCES.get(length, 12)
     
     def should_ask_clarifying_question(
         self,
@@ -311,7 +369,7 @@ class AdaptiveAIBehavior:
     ) -> bool:
         """Check if current mode encourages clarifying questions."""
         mode = mode or self.current_mode
-        return mode in [AIBehaviorMode.COACH, AIBehaviorMode.ANALYST]
+        return mode in self.CLARIFYING_MODES
     
     def should_provide_alternatives(
         self,
@@ -319,7 +377,7 @@ class AdaptiveAIBehavior:
     ) -> bool:
         """Check if current mode encourages providing alternatives."""
         mode = mode or self.current_mode
-        return mode in [AIBehaviorMode.STRATEGIST, AIBehaviorMode.EXPLORER]
+        return mode in self.ALTERNATIVES_MODES
     
     def explain_mode_change(
         self,
@@ -331,13 +389,7 @@ class AdaptiveAIBehavior:
         
         Note: AI should only explain if user explicitly asks.
         """
-        mode_names = {
-            AIBehaviorMode.STRATEGIST: "партнёр-стратег",
-            AIBehaviorMode.ANALYST: "логический аналитик",
-            AIBehaviorMode.COACH: "коуч",
-            AIBehaviorMode.FIXER: "фиксатор",
-            AIBehaviorMode.EXPLORER: "исследователь гипотез",
-        }
+        mode_names = self.MODE_NAMES
         
         return (
             f"Я переключился из режима «{mode_names[from_mode]}» "
@@ -5,9 +5,10 @@ Digital Den — Context Manager
 Assembles context for agents: session, memory, profile.
 """
 
+import asyncio
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Union
 from uuid import UUID, uuid4
 
 from memory.short_term import short_term_memory
@@ -15,13 +16,26 @@ from memory.long_term import long_term_memory
 from orchestrator.profile import get_profile, DigitalProfile
 
 
-@dataclass
+# Max sessions whose hydrated topics are kept in memory
+TOPIC_CACHE_SIZE = 1024
+
+
+@dataclass(slots=True)
 class Message:
     """Chat message structure."""
     role: str  # user, assistant
     content: str
-    timestamp: datetime = field(default_factory=datetime.utcnow)
+    timestamp: Union[str, datetime] = field(default_factory=datetime.utcnow)  # raw ISO string from Redis
     agent: Optional[str] = None
+    
+    def dt(self) -> datetime:
+        """Timestamp as datetime; a raw ISO string is parsed once on first access."""
+        if isinstance(self.timestamp, str):
+            self.timestamp = (
+                datetime.fromisoformat(self.timestamp)
+                if self.timestamp else datetime.utcnow()
+            )
+        return self.timestamp
 
 
 @dataclass
@@ -34,7 +48,7 @@ class MemoryItem:
     created_at: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Topic:
     """Topic classification."""
     id: UUID
@@ -42,7 +56,7 @@ class Topic:
     confidence: float = 0.5
 
 
-@dataclass
+@dataclass(slots=True)
 class AssembledContext:
     """
     Full context assembled for agent processing.
@@ -88,6 +102,17 @@ class ContextManager:
     
     def __init__(self):
         self.profile = get_profile()
+        self._cached_system_prompt = self._render_system_prompt()
+        # session_id → (raw session topics, hydrated Topic objects)
+        self._topic_cache: Dict[str, Tuple[tuple, List[Topic]]] = {}
+    
+    def _render_system_prompt(self) -> str:
+        return self.profile.get_system_prompt() if self.profile else ""
+    
+    def invalidate_profile(self) -> None:
+        """Re-read the profile and rebuild the cached system prompt after it changes."""
+        self.profile = get_profile()
+        self._cached_system_prompt = self._render_system_prompt()
     
     async def get_session(self, session_id: str) -> dict:
         """
@@ -100,15 +125,13 @@ class ContextManager:
         - current_mode
         """
         session = await short_term_memory.get_session(session_id)
-        
+        return await self._ensure_session(session_id, session)
+    
+    async def _ensure_session(self, session_id: str, session: Optional[dict]) -> dict:
+        """Create and persist a fresh session if none was found."""
         if not session:
-            session = {
-                "started_at": datetime.utcnow().isoformat(),
-                "last_activity": datetime.utcnow().isoformat(),
-                "active_topics": [],
-                "current_mode": "default",
-            }
-            await short_term_memory.save_session(session_id, session)
+            session = short_term_memory.new_session()
+            await short_term_memory.set_session(session_id, session)
         
         return session
     
@@ -119,18 +142,47 @@ class ContextManager:
     ) -> List[Message]:
         """Get recent conversation history from Redis."""
         history = await short_term_memory.get_chat_history(session_id, limit)
-        
+        return self._to_messages(history)
+    
+    @staticmethod
+    def _to_messages(history: List[dict]) -> List[Message]:
+        """Convert raw Redis chat entries to Message objects."""
         return [
             Message(
                 role=msg.get("role", "user"),
                 content=msg.get("content", ""),
-                timestamp=datetime.fromisoformat(msg["timestamp"]) 
-                    if msg.get("timestamp") else datetime.utcnow(),
+                timestamp=msg.get("timestamp") or "",
                 agent=msg.get("agent"),
             )
             for msg in history
         ]
     
+    def _session_topics(self, session_id: str, active_topics: List[Any]) -> List[Topic]:
+        """Topic objects for a session, rebuilt only when its topics change."""
+        key = tuple(
+            (t["id"], t["name"]) if isinstance(t, dict) else t
+            for t in active_topics
+        )
+        cached = self._topic_cache.get(session_id)
+        if cached is not None and cached[0] == key:
+            return list(cached[1])
+        
+        topics = self._to_topics(active_topics)
+        if len(self._topic_cache) >= TOPIC_CACHE_SIZE:
+            # Evict the oldest session (dicts keep insertion order)
+            self._topic_cache.pop(next(iter(self._topic_cache)))
+        self._topic_cache[session_id] = (key, topics)
+        return list(topics)
+    
+    @staticmethod
+    def _to_topics(active_topics: List[Any]) -> List[Topic]:
+        """Hydrate session topics; bare names from older sessions get a fresh ID."""
+        return [
+            Topic(id=UUID(t["id"]), name=t["name"])
+            if isinstance(t, dict) else Topic(id=uuid4(), name=t)
+            for t in active_topics
+        ]
+    
     async def get_relevant_memories(
         self,
         query: str,
@@ -176,32 +228,34 @@ class ContextManager:
         Assemble full context for agent processing.
         
         Steps:
-        1. Get/create session
-        2. Load conversation history
-        3. Retrieve relevant memories
-        4. Build system prompt from profile
+        1-3. Get/create session, load conversation history and retrieve
+             relevant memories (concurrently)
+        4. Take the cached system prompt built from the profile
         5. Package everything into AssembledContext
         """
         session_id = session_id or uuid4()
         session_id_str = str(session_id)
         
-        # Get session
-        session = await self.get_session(session_id_str)
-        
-        # Get conversation history
-        history = await self.get_conversation_history(session_id_str)
-        
-        # Get relevant memories
-        memories = []
+        # Session and history share one Redis round-trip; memories come from
+        # Postgres and are fetched concurrently
+        fetches = [
+            short_term_memory.get_session_and_history(session_id_str, limit=10),
+        ]
         if include_memories and db:
-            memories = await self.get_relevant_memories(
+            fetches.append(self.get_relevant_memories(
                 query=message,
                 db=db,
                 limit=5,
-            )
+            ))
+        
+        (session, raw_history), *rest = await asyncio.gather(*fetches)
+        memories = rest[0] if rest else []
         
-        # Build system prompt
-        system_prompt = self.profile.get_system_prompt() if self.profile else ""
+        session = await self._ensure_session(session_id_str, session)
+        history = self._to_messages(raw_history)
+        
+        # System prompt is rendered once per profile (see invalidate_profile)
+        system_prompt = self._cached_system_prompt
         
         # Assemble context
         context = AssembledContext(
@@ -212,10 +266,9 @@ class ContextManager:
             profile=self.profile,
             system_prompt=system_prompt,
             relevant_memories=memories,
-            active_topics=[
-                Topic(id=uuid4(), name=t) 
-                for t in session.get("active_topics", [])
-            ],
+            active_topics=self._session_topics(
+                session_id_str, session.get("active_topics", [])
+            ),
             metadata={
                 "session": session,
             },
@@ -228,11 +281,26 @@ class ContextManager:
         session_id: str, 
         topics: List[str]
     ) -> None:
-        """Update active topics for session."""
-        session = await self.get_session(session_id)
-        session["active_topics"] = topics
-        session["last_activity"] = datetime.utcnow().isoformat()
-        await short_term_memory.save_session(session_id, session)
+        """
+        Update active topics for session.
+        
+        Topic IDs are stored with the names, so every assemble hydrates the
+        same stable IDs. A topic already active keeps its ID; only new names
+        get a fresh one.
+        """
+        session = await short_term_memory.get_session(session_id) or {}
+        known_ids = {
+            t["name"]: t["id"]
+            for t in session.get("active_topics") or []
+            if isinstance(t, dict)
+        }
+        await short_term_memory.update_session(session_id, {
+            "active_topics": [
+                {"id": known_ids.get(t) or str(uuid4()), "name": t}
+                for t in topics
+            ],
+            "last_activity": datetime.utcnow().isoformat(),
+        })
 
 
 # Global instance
@@ -5,12 +5,78 @@ Digital Den — Context Assembler (RAG 2.0)
 Структурированная сборка контекста для LLM с явными маркерами приоритетов.
 """
 
-from typing import List, Tuple, Dict, Optional
-from collections import defaultdict
+from datetime import date, datetime
+from types import MappingProxyType
+from typing import List, Tuple, Dict, Optional, NamedTuple
 
 from memory.models import MemoryItem, ConversationState, UserSettings, Message
 
 
+# Маркеры уверенности для строк памяти
+_CONFIDENCE_MARKERS = MappingProxyType({
+    "high": "✓",
+    "medium": "~",
+    "low": "?",
+    "unknown": "?",
+})
+
+
+# (date, "YYYY-MM-DD (Weekday)") — дата форматируется раз в сутки
+_today_cache: Tuple[Optional[date], str] = (None, "")
+
+
+def _today_label(now: datetime) -> str:
+    """Метка текущей даты для [TIME CONTEXT], кэшируется до смены дня"""
+    global _today_cache
+    today = now.date()
+    if _today_cache[0] != today:
+        _today_cache = (today, f"{today:%Y-%m-%d} ({today:%A})")
+    return _today_cache[1]
+
+
+def _memory_stub(mem: MemoryItem) -> str:
+    """
+    Статичная часть блока памяти (всё, кроме score и usage).
+    
+    Кэшируется на самом объекте вместе с полями, из которых собрана, —
+    при изменении content/summary/типа/уверенности/даты пересобирается.
+    """
+    key = (mem.content, mem.summary, mem.item_type, mem.confidence_level, mem.created_at)
+    cached = getattr(mem, "_format_stub", None)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
+    confidence_marker = _CONFIDENCE_MARKERS.get(mem.confidence_level, "?")
+    stub = (
+        f"{confidence_marker} [{mem.item_type}] {mem.content}\n"
+        + (f"   Summary: {mem.summary}\n" if mem.summary else "")
+        + "   ("
+        + (f"Created: {mem.created_at:%Y-%m-%d}, " if mem.created_at else "")
+    )
+    mem._format_stub = (key, stub)
+    return stub
+
+
+def _format_memory(mem: MemoryItem, score: float) -> str:
+    """Форматирует одно воспоминание (строка, summary, метаданные)"""
+    return (
+        _memory_stub(mem)
+        + f"Score: {score:.2f}"
+        + (f", Used: {mem.usage_count}x" if mem.usage_count else "")
+        + ")\n"
+    )
+
+
+class MemoryBuckets(NamedTuple):
+    """Память, разложенная по секциям контекста (в порядке подачи)."""
+    rules: List[Tuple[MemoryItem, float]]
+    facts_high: List[Tuple[MemoryItem, float]]
+    decisions: List[Tuple[MemoryItem, float]]
+    hypotheses: List[Tuple[MemoryItem, float]]
+    reflections: List[Tuple[MemoryItem, float]]
+    insights: List[Tuple[MemoryItem, float]]
+
+
 class ContextAssembler:
     """
     Собирает фреймированный контекст для LLM.
@@ -50,12 +116,12 @@ class ContextAssembler:
         Returns:
             str: Фреймированный контекст для LLM
         """
-        sections = []
+        # Секции добавляются только после проверки, что им есть что показать
+        sections: List[str] = []
         
         # 0. Time context
-        from datetime import datetime
         now = datetime.now()
-        sections.append(f"[TIME CONTEXT]\nToday: {now.strftime('%Y-%m-%d')} ({now.strftime('%A')})\nCurrent Time: {now.strftime('%H:%M')}\n")
+        sections.append(f"[TIME CONTEXT]\nToday: {_today_label(now)}\nCurrent Time: {now.hour:02d}:{now.minute:02d}\n")
 
         # 1. System Rules
         if user_settings:
@@ -65,61 +131,55 @@ class ContextAssembler:
         if conversation_state:
             sections.append(self._format_conversation_state(conversation_state))
         
-        # 3. Сортировка памяти по типам
-        memories_by_type = self._group_by_type(relevant_memories)
+        # 3. Раскладка памяти по секциям (один проход)
+        buckets = self._bucketize(relevant_memories)
         
         # 4. Rules & Principles
-        rules_and_principles = memories_by_type.get("rule", []) + memories_by_type.get("principle", [])
-        if rules_and_principles:
+        if buckets.rules:
             sections.append(self._format_section(
                 title="[RULES & PRINCIPLES]",
                 note="Priority, no decay",
-                memories=rules_and_principles
+                memories=buckets.rules
             ))
         
         # 5. Facts (High Confidence)
-        high_confidence_facts = [
-            (m, score) for m, score in memories_by_type.get("fact", [])
-            if m.confidence_level == "high"
-        ]
-        if high_confidence_facts:
+        if buckets.facts_high:
             sections.append(self._format_section(
                 title="[FACTS — HIGH CONFIDENCE]",
                 note="Verified",
-                memories=high_confidence_facts
+                memories=buckets.facts_high
             ))
         
         # 6. Decisions
-        if "decision" in memories_by_type:
+        if buckets.decisions:
             sections.append(self._format_section(
                 title="[DECISIONS]",
                 note="User-made",
-                memories=memories_by_type["decision"]
+                memories=buckets.decisions
             ))
         
         # 7. Hypotheses
-        if "hypothesis" in memories_by_type:
+        if buckets.hypotheses:
             sections.append(self._format_section(
                 title="[HYPOTHESES]",
                 note="⚠️ NOT CONFIRMED",
-                memories=memories_by_type["hypothesis"]
+                memories=buckets.hypotheses
             ))
         
         # 8. Reflections / Failures
-        reflections = memories_by_type.get("reflection", []) + memories_by_type.get("failure", [])
-        if reflections:
+        if buckets.reflections:
             sections.append(self._format_section(
                 title="[REFLECTIONS / FAILURES]",
                 note="For analysis only",
-                memories=reflections
+                memories=buckets.reflections
             ))
         
         # 9. Insights
-        if "insight" in memories_by_type:
+        if buckets.insights:
             sections.append(self._format_section(
                 title="[INSIGHTS]",
                 note="Key observations",
-                memories=memories_by_type["insight"]
+                memories=buckets.insights
             ))
         
         # 10. Conflicts
@@ -178,59 +238,24 @@ class ContextAssembler:
         memories: List[Tuple[MemoryItem, float]]
     ) -> str:
         """Форматирует секцию памяти"""
-        if not memories:
-            return ""
-        
         lines = [title, f"({note})", ""]
-        
-        for mem, score in memories:
-            # Confidence marker
-            confidence_marker = {
-                "high": "✓",
-                "medium": "~",
-                "low": "?",
-                "unknown": "?"
-            }.get(mem.confidence_level, "?")
-            
-            # Format line
-            lines.append(f"{confidence_marker} [{mem.item_type}] {mem.content}")
-            
-            if mem.summary:
-                lines.append(f"   Summary: {mem.summary}")
-            
-            # Метаданные (score, дата, usage)
-            meta_parts = []
-            if mem.created_at:
-                meta_parts.append(f"Created: {mem.created_at.strftime('%Y-%m-%d')}")
-            meta_parts.append(f"Score: {score:.2f}")
-            if mem.usage_count > 0:
-                meta_parts.append(f"Used: {mem.usage_count}x")
-            
-            lines.append(f"   ({', '.join(meta_parts)})")
-            lines.append("")
-        
+        lines.extend(_format_memory(mem, score) for mem, score in memories)
         return "\n".join(lines)
     
     def _format_conflicts(self, conflicts: List[Dict]) -> str:
         """Форматирует обнаруженные конфликты"""
-        if not conflicts:
-            return ""
-        
         lines = ["[⚠️ CONFLICTS DETECTED]", ""]
         
         for conf in conflicts:
             lines.append(f"Type: {conf['type']} (confidence: {conf.get('confidence', 0.7):.1f})")
-            lines.append(f"  A [{conf['memory_a'].item_type}]: {conf['memory_a'].content[:100]}...")
-            lines.append(f"  B [{conf['memory_b'].item_type}]: {conf['memory_b'].content[:100]}...")
+            lines.append(f"  A [{conf['memory_a'].item_type}]: {conf['memory_a'].content_preview}...")
+            lines.append(f"  B [{conf['memory_b'].item_type}]: {conf['memory_b'].content_preview}...")
             lines.append("")
         
         return "\n".join(lines)
     
     def _format_recent_messages(self, messages: List[Dict]) -> str:
         """Форматирует последние сообщения"""
-        if not messages:
-            return ""
-        
         lines = ["[RECENT CONVERSATION]", ""]
         
         for msg in messages[-5:]:  # последние 5
@@ -243,17 +268,31 @@ class ContextAssembler:
         lines.append("")
         return "\n".join(lines)
     
-    def _group_by_type(
+    def _bucketize(
         self,
         memories: List[Tuple[MemoryItem, float]]
-    ) -> Dict[str, List[Tuple[MemoryItem, float]]]:
-        """Группирует память по типам"""
-        grouped = defaultdict(list)
+    ) -> MemoryBuckets:
+        """Раскладывает память по секциям контекста за один проход"""
+        rules, facts_high, decisions = [], [], []
+        hypotheses, reflections, insights = [], [], []
         
         for mem, score in memories:
-            grouped[mem.item_type].append((mem, score))
+            item_type = mem.item_type
+            if item_type in ("rule", "principle"):
+                rules.append((mem, score))
+            elif item_type == "fact":
+                if mem.confidence_level == "high":
+                    facts_high.append((mem, score))
+            elif item_type == "decision":
+                decisions.append((mem, score))
+            elif item_type == "hypothesis":
+                hypotheses.append((mem, score))
+            elif item_type in ("reflection", "failure"):
+                reflections.append((mem, score))
+            elif item_type == "insight":
+                insights.append((mem, score))
         
-        return dict(grouped)
+        return MemoryBuckets(rules, facts_high, decisions, hypotheses, reflections, insights)
 
 
 # Global instance
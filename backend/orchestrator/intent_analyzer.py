@@ -6,18 +6,36 @@ Advanced intent analysis for incoming user requests.
 Extracts: category, confidence, emotional_state, urgency, requires_clarification.
 """
 
-import json
+import asyncio
 import re
+from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Optional, List
 from enum import Enum
 
+import numpy as np
+import orjson
+from pydantic import BaseModel, Field
+
+try:  # optional: local intent model (see LocalIntentModel)
+    import onnxruntime
+    from tokenizers import Tokenizer
+except ImportError:
+    onnxruntime = None
+    Tokenizer = None
+
 from llm.openrouter import openrouter
+from llm.reply_cache import ReplyCache
 from core.config import settings
 from core.logging import get_logger
+from core.keywords import compile_keywords
+from orchestrator.intent_classifier import KEYWORD_INDEX
 
 logger = get_logger(__name__)
 
+# Prefixes added by voice recognition, stripped before analysis
+VOICE_PREFIXES = ("🎤 Распознано: ", "Распознано: ")
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Intent Types
@@ -56,11 +74,17 @@ class ActionType(str, Enum):
     CLARIFY = "clarify"         # Уточнить
 
 
+# value → member, for parsing LLM replies; unknown values fall back to defaults
+_CATEGORIES = {c.value: c for c in RequestCategory}
+_EMOTIONS = {e.value: e for e in EmotionalState}
+_ACTIONS = {a.value: a for a in ActionType}
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # Intent Analysis Result
 # ═══════════════════════════════════════════════════════════════════════════
 
-@dataclass
+@dataclass(slots=True)
 class IntentAnalysis:
     """Complete analysis of user intent."""
     
@@ -85,6 +109,132 @@ class IntentAnalysis:
     raw_response: Optional[str] = None
 
 
+class IntentSchema(BaseModel):
+    """JSON schema of the LLM reply — passed as response_format."""
+    
+    category: RequestCategory
+    confidence: float = Field(ge=0, le=1)
+    emotional_state: EmotionalState
+    urgency: float = Field(ge=0, le=1)
+    action_type: ActionType
+    requires_clarification: bool
+    clarification_question: Optional[str]
+    topics: List[str]
+    time_references: List[str]
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Intent Prompt
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Static instructions go in the system message: identical on every call,
+# so providers with prompt caching reuse them. Only the message varies.
+INTENT_SYSTEM_PROMPT = """Проанализируй сообщение пользователя и определи его намерение.
+
+Верни JSON (без markdown!):
+{
+    "category": "strategic|analytical|operational|reflexive|meta|schedule|creative|social",
+    "confidence": 0.0-1.0,
+    "emotional_state": "neutral|positive|negative|stressed|curious|confused",
+    "urgency": 0.0-1.0,
+    "action_type": "answer|execute|plan|remember|remind|analyze|clarify",
+    "requires_clarification": true|false,
+    "clarification_question": null,
+    "topics": ["тема1", "тема2"],
+    "time_references": ["завтра", "в 15:00"]
+}
+
+Правила:
+1. category:
+   - strategic: долгосрочное планирование, видение
+   - analytical: анализ данных, метрики
+   - operational: задачи, действия (по умолчанию)
+   - reflexive: размышления о себе, самоанализ
+   - meta: вопросы о системе ИИ
+   - schedule: расписание, напоминания, встречи
+   - creative: творческие задачи, генерация
+   - social: приветствия, small talk
+
+2. confidence: уверенность в классификации (0.5 — не уверен, 1.0 — точно)
+
+3. emotional_state:
+   - positive: радость, энтузиазм, "круто", "отлично"
+   - negative: раздражение, "опять", "достало"
+   - stressed: срочность, "срочно", "быстрее"
+   - curious: вопросы, интерес
+   - confused: непонимание, "не понял"
+
+4. urgency: 0.0 — не срочно, 1.0 — очень срочно
+
+5. requires_clarification: если нет важной информации"""
+
+# Structured output: the provider constrains decoding to this schema,
+# so enum fields can only take valid values.
+INTENT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "intent", "schema": IntentSchema.model_json_schema()},
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Local Intent Model
+# ═══════════════════════════════════════════════════════════════════════════
+
+class LocalIntentModel:
+    """
+    On-CPU category classifier (ONNX export of a fine-tuned small encoder).
+    
+    Model directory layout:
+    - model.onnx      — text-classification head, inputs input_ids/attention_mask
+    - tokenizer.json  — HuggingFace tokenizers file
+    - labels.json     — RequestCategory values in logit order
+    """
+    
+    MAX_LENGTH = 128
+    
+    def __init__(self, model_dir: Path):
+        self._session = onnxruntime.InferenceSession(
+            str(model_dir / "model.onnx"),
+            providers=["CPUExecutionProvider"],
+        )
+        self._input_names = {i.name for i in self._session.get_inputs()}
+        self._tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self._tokenizer.enable_truncation(self.MAX_LENGTH)
+        self.labels = [
+            RequestCategory(label)
+            for label in orjson.loads((model_dir / "labels.json").read_bytes())
+        ]
+    
+    @classmethod
+    def load(cls, model_dir: Optional[str]) -> Optional["LocalIntentModel"]:
+        """Model from settings, or None if not configured / not loadable."""
+        if not model_dir:
+            return None
+        if onnxruntime is None:
+            logger.warning("intent_local_model_unavailable", reason="onnxruntime/tokenizers not installed")
+            return None
+        try:
+            return cls(Path(model_dir))
+        except Exception as e:
+            logger.warning("intent_local_model_load_error", error=str(e))
+            return None
+    
+    def predict(self, message: str) -> tuple[RequestCategory, float]:
+        """Most likely category and its probability."""
+        encoding = self._tokenizer.encode(message)
+        inputs = {
+            "input_ids": np.asarray([encoding.ids], dtype=np.int64),
+            "attention_mask": np.asarray([encoding.attention_mask], dtype=np.int64),
+        }
+        logits = self._session.run(
+            None, {name: v for name, v in inputs.items() if name in self._input_names}
+        )[0][0]
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        best = int(probs.argmax())
+        return self.labels[best], float(probs[best])
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # Intent Analyzer
 # ═══════════════════════════════════════════════════════════════════════════
@@ -111,100 +261,176 @@ class IntentAnalyzer:
         "анализ", "данные", "метрики", "статистика", "тренд", "график"
     ]
     
-    async def analyze(self, message: str) -> IntentAnalysis:
+    # Time / urgency markers that make a single schedule keyword decisive
+    SCHEDULE_MARKERS_RE = re.compile(r"срочно|сейчас|через|\bв \d")
+    URGENT_MARKERS = frozenset({"срочно", "сейчас"})
+    
+    # Fallback heuristics — one regex scan per signal
+    URGENCY_RE = compile_keywords(["срочно", "быстро", "сейчас", "немедленно"])
+    POSITIVE_RE = compile_keywords(["спасибо", "отлично", "круто", "супер"])
+    STRESS_RE = compile_keywords(["срочно", "быстро", "успеть"])
+    
+    def __init__(self):
+        self._cache = ReplyCache(
+            maxsize=settings.intent_cache_size,
+            semantic_size=(
+                settings.intent_semantic_cache_size
+                if settings.intent_semantic_cache else 0
+            ),
+            threshold=settings.intent_semantic_threshold,
+        )
+        self._local_model = LocalIntentModel.load(settings.intent_local_model_dir)
+    
+    @staticmethod
+    def _keyword_hits(message_lower: str) -> dict:
+        """Category → keyword count, from the index shared with IntentClassifier."""
+        return KEYWORD_INDEX.scores(message_lower).get("analyzer", {})
+    
+    async def analyze(
+        self,
+        message: str,
+        message_lower: Optional[str] = None,
+    ) -> IntentAnalysis:
         """
         Analyze user message and extract intent.
         
+        message_lower: message.lower() if the caller already has it.
+        
         Returns IntentAnalysis with all detected signals.
         """
+        if message_lower is None:
+            message_lower = message.lower()
         
         # Strip common prefixes (like voice recognition)
-        clean_message = re.sub(r"^(🎤 )?Распознано: ", "", message)
-        message_lower = clean_message.lower()
+        clean_message = message
+        for prefix in VOICE_PREFIXES:
+            if message.startswith(prefix):
+                clean_message = message[len(prefix):]
+                message_lower = message_lower[len(prefix):]
+                break
         
         # Quick keyword check for schedule
-        if any(kw in message_lower for kw in self.SCHEDULE_KEYWORDS):
+        schedule_hits = self._keyword_hits(message_lower).get(RequestCategory.SCHEDULE, 0)
+        if schedule_hits:
+            # Strong signal: answer locally, no LLM round-trip
+            if settings.intent_skip_llm_on_high_confidence:
+                quick_result = self._schedule_analysis(message_lower, schedule_hits)
+                if quick_result is not None:
+                    return quick_result
+            
             # Lower confidence to allow LLM to override if it's a meta-question
             quick_result = IntentAnalysis(
                 category=RequestCategory.SCHEDULE,
                 confidence=0.6, 
                 action_type=ActionType.REMIND,
             )
-            return await self._full_analysis(clean_message, quick_hint=quick_result)
+            return await self._full_analysis(clean_message, message_lower, quick_hint=quick_result)
+        
+        # Local model first; the LLM only handles the ambiguous rest.
+        # ONNX inference is CPU-bound, so it runs off the event loop.
+        if self._local_model is not None:
+            category, probability = await asyncio.to_thread(
+                self._local_model.predict, clean_message
+            )
+            if probability >= settings.intent_local_threshold:
+                logger.info(
+                    "intent_analyzed_locally",
+                    category=category.value,
+                    confidence=probability,
+                )
+                return IntentAnalysis(category=category, confidence=probability)
         
         # Full LLM analysis
-        return await self._full_analysis(clean_message)
+        return await self._full_analysis(clean_message, message_lower)
+    
+    def _schedule_analysis(
+        self,
+        message_lower: str,
+        schedule_hits: int,
+    ) -> Optional[IntentAnalysis]:
+        """
+        Local SCHEDULE analysis for unambiguous scheduling requests.
+        
+        Strong: no question, and ≥2 schedule keywords or one plus a
+        time/urgency marker. Returns None when the LLM should decide
+        (questions may be meta, e.g. about how scheduling works).
+        """
+        markers = set(self.SCHEDULE_MARKERS_RE.findall(message_lower))
+        if "?" in message_lower or (schedule_hits < 2 and not markers):
+            return None
+        
+        urgent = not markers.isdisjoint(self.URGENT_MARKERS)
+        logger.info("intent_analyzed_locally", category=RequestCategory.SCHEDULE.value)
+        return IntentAnalysis(
+            category=RequestCategory.SCHEDULE,
+            confidence=0.9,
+            emotional_state=EmotionalState.STRESSED if urgent else EmotionalState.NEUTRAL,
+            urgency=0.9 if urgent else 0.5,
+            action_type=ActionType.REMIND,
+        )
+    
+    async def analyze_many(
+        self,
+        messages: List[str],
+        concurrency: Optional[int] = None,
+    ) -> List[IntentAnalysis]:
+        """
+        Analyze a batch of messages (history replay, backlog ingestion).
+        
+        LLM calls overlap, at most `concurrency` at a time
+        (default: settings.intent_batch_concurrency). Results keep input order.
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.intent_batch_concurrency)
+        
+        async def analyze_one(message: str) -> IntentAnalysis:
+            async with semaphore:
+                return await self.analyze(message)
+        
+        return list(await asyncio.gather(*(analyze_one(m) for m in messages)))
     
     async def _full_analysis(
         self, 
         message: str, 
+        message_lower: str,
         quick_hint: Optional[IntentAnalysis] = None
     ) -> IntentAnalysis:
         """Perform full LLM-based analysis."""
         
-        prompt = f"""Проанализируй сообщение пользователя и определи его намерение.
-
-Сообщение: "{message[:500]}"
-
-Верни JSON (без markdown!):
-{{
-    "category": "strategic|analytical|operational|reflexive|meta|schedule|creative|social",
-    "confidence": 0.0-1.0,
-    "emotional_state": "neutral|positive|negative|stressed|curious|confused",
-    "urgency": 0.0-1.0,
-    "action_type": "answer|execute|plan|remember|remind|analyze|clarify",
-    "requires_clarification": true|false,
-    "clarification_question": null,
-    "topics": ["тема1", "тема2"],
-    "time_references": ["завтра", "в 15:00"]
-}}
-
-Правила:
-1. category:
-   - strategic: долгосрочное планирование, видение
-   - analytical: анализ данных, метрики
-   - operational: задачи, действия (по умолчанию)
-   - reflexive: размышления о себе, самоанализ
-   - meta: вопросы о системе ИИ
-   - schedule: расписание, напоминания, встречи
-   - creative: творческие задачи, генерация
-   - social: приветствия, small talk
-
-2. confidence: уверенность в классификации (0.5 — не уверен, 1.0 — точно)
-
-3. emotional_state:
-   - positive: радость, энтузиазм, "круто", "отлично"
-   - negative: раздражение, "опять", "достало"
-   - stressed: срочность, "срочно", "быстрее"
-   - curious: вопросы, интерес
-   - confused: непонимание, "не понял"
-
-4. urgency: 0.0 — не срочно, 1.0 — очень срочно
-
-5. requires_clarification: если нет важной информации
-
-Верни ТОЛЬКО JSON:"""
-
+        prompt = f'Сообщение: "{message[:500]}"\n\nВерни ТОЛЬКО JSON:'
+        
+        cache_key = self._cache.normalize(message)
+        
         try:
-            result = await openrouter.complete_simple(
-                prompt,
-                model=settings.cheap_model
-            )
+            content = self._cache.get(cache_key)
+            vector = None
+            if content is None and self._cache.semantic:
+                vector = await self._embed(message)
+                if vector is not None:
+                    content = self._cache.get_similar(vector)
             
-            # Clean response
-            content = result.strip()
-            if content.startswith("```"):
-                content = re.sub(r"```(?:json)?\n?", "", content)
-                content = content.strip()
+            cached = content is not None
+            if not cached:
+                result = await openrouter.complete_simple(
+                    prompt,
+                    system=INTENT_SYSTEM_PROMPT,
+                    model=settings.cheap_model,
+                    response_format=INTENT_RESPONSE_FORMAT,
+                )
+                
+                # Clean response (models without structured output may still fence it)
+                content = result.strip()
+                if content.startswith("```"):
+                    content = re.sub(r"```(?:json)?\n?", "", content)
+                    content = content.strip()
             
-            data = json.loads(content)
+            data = orjson.loads(content)
             
             analysis = IntentAnalysis(
-                category=RequestCategory(data.get("category", "operational")),
+                category=_CATEGORIES.get(data.get("category"), RequestCategory.OPERATIONAL),
                 confidence=float(data.get("confidence", 0.5)),
-                emotional_state=EmotionalState(data.get("emotional_state", "neutral")),
+                emotional_state=_EMOTIONS.get(data.get("emotional_state"), EmotionalState.NEUTRAL),
                 urgency=float(data.get("urgency", 0.5)),
-                action_type=ActionType(data.get("action_type", "answer")),
+                action_type=_ACTIONS.get(data.get("action_type"), ActionType.ANSWER),
                 requires_clarification=bool(data.get("requires_clarification", False)),
                 clarification_question=data.get("clarification_question"),
                 topics=data.get("topics", []),
@@ -212,6 +438,10 @@ class IntentAnalyzer:
                 raw_response=content,
             )
             
+            # Cache only replies that parsed into a valid analysis
+            if not cached:
+                self._cache.put(cache_key, content, vector)
+            
             # Merge with quick hint if provided
             if quick_hint and quick_hint.confidence > analysis.confidence:
                 analysis.category = quick_hint.category
@@ -227,39 +457,47 @@ class IntentAnalyzer:
             
             return analysis
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.warning("intent_parse_error", error=str(e))
-            return self._fallback_analysis(message)
+            return self._fallback_analysis(message, message_lower)
         except Exception as e:
             logger.error("intent_analysis_error", error=str(e))
-            return self._fallback_analysis(message)
+            return self._fallback_analysis(message, message_lower)
+    
+    async def _embed(self, message: str) -> Optional[np.ndarray]:
+        """Embedding for the semantic cache tier; None if unavailable."""
+        try:
+            embedding = await openrouter.get_embedding(message[:500])
+        except Exception as e:
+            logger.warning("intent_cache_embedding_error", error=str(e))
+            return None
+        return self._cache.as_unit_vector(embedding)
     
-    def _fallback_analysis(self, message: str) -> IntentAnalysis:
+    def _fallback_analysis(self, message: str, message_lower: str) -> IntentAnalysis:
         """Fallback keyword-based analysis when LLM fails."""
         
-        message_lower = message.lower()
-        
         # Determine category
         category = RequestCategory.OPERATIONAL
-        if any(kw in message_lower for kw in self.SCHEDULE_KEYWORDS):
+        keyword_hits = self._keyword_hits(message_lower)
+        if RequestCategory.SCHEDULE in keyword_hits:
             category = RequestCategory.SCHEDULE
-        elif any(kw in message_lower for kw in self.STRATEGIC_KEYWORDS):
+        elif RequestCategory.STRATEGIC in keyword_hits:
             category = RequestCategory.STRATEGIC
-        elif any(kw in message_lower for kw in self.ANALYTICAL_KEYWORDS):
+        elif RequestCategory.ANALYTICAL in keyword_hits:
             category = RequestCategory.ANALYTICAL
         elif "?" in message:
             category = RequestCategory.OPERATIONAL
         
         # Detect urgency keywords
         urgency = 0.5
-        if any(kw in message_lower for kw in ["срочно", "быстро", "сейчас", "немедленно"]):
+        if self.URGENCY_RE.search(message_lower):
             urgency = 0.9
         
         # Detect emotional state
         emotional_state = EmotionalState.NEUTRAL
-        if any(kw in message_lower for kw in ["спасибо", "отлично", "круто", "супер"]):
+        if self.POSITIVE_RE.search(message_lower):
             emotional_state = EmotionalState.POSITIVE
-        elif any(kw in message_lower for kw in ["срочно", "быстро", "успеть"]):
+        elif self.STRESS_RE.search(message_lower):
             emotional_state = EmotionalState.STRESSED
         elif "?" in message:
             emotional_state = EmotionalState.CURIOUS
@@ -277,5 +515,11 @@ class IntentAnalyzer:
         return analysis.category.value
 
 
+KEYWORD_INDEX.register("analyzer", {
+    RequestCategory.SCHEDULE: IntentAnalyzer.SCHEDULE_KEYWORDS,
+    RequestCategory.STRATEGIC: IntentAnalyzer.STRATEGIC_KEYWORDS,
+    RequestCategory.ANALYTICAL: IntentAnalyzer.ANALYTICAL_KEYWORDS,
+})
+
 # Global instance
 intent_analyzer = IntentAnalyzer()
@@ -5,13 +5,21 @@ Digital Den — Intent Classifier
 Определяет intent пользовательского сообщения для intent-aware RAG.
 """
 
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Pattern
 
+from core.keywords import compile_keywords
 from memory.models import ConversationState
 
+try:
+    import ahocorasick  # pyahocorasick
+except ImportError:  # C-расширение может не собраться (Windows без build tools)
+    ahocorasick = None
+
 
 # Список интентов RAG 2.0
 INTENTS = [
+    "schedule",           # Расписание, напоминания
+    "memory",             # Поиск по прошлым разговорам
     "decision_request",   # Запрос на помощь в принятии решения
     "analysis",           # Анализ ситуации / проблемы
     "fact_check",         # Проверка факта или информации
@@ -22,6 +30,104 @@ INTENTS = [
 ]
 
 
+class KeywordMatcher:
+    """
+    Поиск ключевых слов нескольких групп за один проход по тексту.
+    
+    С pyahocorasick — один автомат Ахо–Корасик на все группы;
+    без него — регулярка-альтернация на группу.
+    """
+    
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        self.groups: Dict[str, List[str]] = {
+            name: list(keywords) for name, keywords in groups.items()
+        }
+        self._automaton = None
+        self._patterns: Dict[str, Pattern[str]] = {}
+        
+        if ahocorasick is not None:
+            # keyword → группы, с повторами (дубли в списке считаются дважды)
+            owners: Dict[str, List[str]] = {}
+            for name, keywords in self.groups.items():
+                for kw in keywords:
+                    owners.setdefault(kw, []).append(name)
+            
+            self._automaton = ahocorasick.Automaton()
+            for kw, names in owners.items():
+                self._automaton.add_word(kw, (kw, tuple(names)))
+            self._automaton.make_automaton()
+        else:
+            self._patterns = {
+                name: compile_keywords(keywords)
+                for name, keywords in self.groups.items()
+            }
+    
+    def scores(self, text: str) -> Dict[str, int]:
+        """Группа → сколько её ключевых слов встречается в тексте (нулевые опущены)"""
+        if self._automaton is None:
+            return {
+                name: sum(1 for kw in self.groups[name] if kw in text)
+                for name, pattern in self._patterns.items()
+                if pattern.search(text)
+            }
+        
+        scores: Dict[str, int] = {}
+        seen = set()
+        for _, (kw, names) in self._automaton.iter(text):
+            if kw in seen:
+                continue
+            seen.add(kw)
+            for name in names:
+                scores[name] = scores.get(name, 0) + 1
+        # Порядок объявления групп, а не появления в тексте: max() при равных
+        # score берёт первую группу — так же, как на пути с регулярками
+        return {name: scores[name] for name in self.groups if name in scores}
+
+
+class KeywordIndex:
+    """
+    Общий индекс ключевых слов для нескольких классификаторов.
+    
+    Каждый регистрирует свои группы под своим namespace; один автомат
+    на всех, и один проход по тексту даёт score всех namespace сразу.
+    Последний результат запоминается — IntentAnalyzer и IntentClassifier
+    на одном и том же тексте сканируют его один раз.
+    """
+    
+    def __init__(self):
+        self._groups: Dict[tuple, List[str]] = {}
+        self._matcher: Optional[KeywordMatcher] = None
+        self._last: tuple = (None, {})
+    
+    def register(self, namespace: str, groups: Dict[str, Iterable[str]]) -> None:
+        for name, keywords in groups.items():
+            self._groups[(namespace, name)] = list(keywords)
+        self._matcher = None  # перестроится при следующем scores()
+        self._last = (None, {})
+    
+    def scores(self, text: str) -> Dict[str, Dict[str, int]]:
+        """
+        namespace → {группа → score} в порядке регистрации групп
+        (по нему max() разрешает равные score). Результат общий — не изменять.
+        """
+        last_text, last_scores = self._last
+        if text == last_text:
+            return last_scores
+        
+        if self._matcher is None:
+            self._matcher = KeywordMatcher(self._groups)
+        
+        result: Dict[str, Dict[str, int]] = {}
+        for (namespace, name), score in self._matcher.scores(text).items():
+            result.setdefault(namespace, {})[name] = score
+        self._last = (text, result)
+        return result
+
+
+# Единый индекс: IntentClassifier ("classifier") и IntentAnalyzer ("analyzer")
+KEYWORD_INDEX = KeywordIndex()
+
+
 class IntentClassifier:
     """
     Определяет intent пользовательского сообщения.
@@ -83,10 +189,17 @@ class IntentClassifier:
         ],
     }
     
+    # Эвристики для сообщений без совпадений по KEYWORDS
+    QUESTION_WORDS_RE = compile_keywords(["почему", "зачем", "как", "что"])
+    FACT_WORDS_RE = compile_keywords(["правда", "верно", "точно"])
+    DECISION_PHRASES_RE = compile_keywords(["что делать", "стоит ли", "как поступить"])
+    ANALYSIS_OPENERS = ("почему", "как", "зачем", "в чём")
+    
     def classify(
         self,
         message: str,
-        conversation_state: Optional[ConversationState] = None
+        conversation_state: Optional[ConversationState] = None,
+        message_lower: Optional[str] = None,
     ) -> str:
         """
         Классифицирует intent пользовательского сообщения.
@@ -94,18 +207,18 @@ class IntentClassifier:
         Args:
             message: Текст сообщения
             conversation_state: Состояние диалога (опционально)
+            message_lower: message.lower(), если уже посчитан вызывающим
             
         Returns:
-            Один из интентов: decision_request, analysis, fact_check, planning, reflection, kaizen_review, casual
+            Один из INTENTS
         """
-        message_lower = message.lower()
+        if message_lower is None:
+            # str.lower() быстрее str.translate с таблицей А-Я → а-я (~15× на кириллице)
+            message_lower = message.lower()
         
         # 1. Проверка по ключевым словам
-        intent_scores = {}
-        for intent, keywords in self.KEYWORDS.items():
-            score = sum(1 for kw in keywords if kw in message_lower)
-            if score > 0:
-                intent_scores[intent] = score
+        # score интента = число его ключевых слов в сообщении (один проход)
+        intent_scores = KEYWORD_INDEX.scores(message_lower).get("classifier", {})
         
         # Если есть явное совпадение — возвращаем
         if intent_scores:
@@ -122,9 +235,9 @@ class IntentClassifier:
             # Если есть открытые вопросы — возможно analysis или fact_check
             if conversation_state.open_questions:
                 # Проверяем, есть ли в сообщении вопросительные слова
-                if any(q in message_lower for q in ["почему", "зачем", "как", "что"]):
+                if self.QUESTION_WORDS_RE.search(message_lower):
                     return "analysis"
-                elif any(q in message_lower for q in ["правда", "верно", "точно"]):
+                elif self.FACT_WORDS_RE.search(message_lower):
                     return "fact_check"
             
             # Если current_step указывает на рефлексию
@@ -137,15 +250,17 @@ class IntentClassifier:
         # Вопросительные предложения
         if "?" in message:
             # Если вопрос начинается с "почему" / "как" — analysis
-            if message_lower.strip().startswith(("почему", "как", "зачем", "в чём")):
+            if message_lower.strip().startswith(self.ANALYSIS_OPENERS):
                 return "analysis"
             # Если "что делать" / "стоит ли" — decision_request
-            elif any(phrase in message_lower for phrase in ["что делать", "стоит ли", "как поступить"]):
+            elif self.DECISION_PHRASES_RE.search(message_lower):
                 return "decision_request"
         
         # 4. Fallback
         return "casual"
 
 
+KEYWORD_INDEX.register("classifier", IntentClassifier.KEYWORDS)
+
 # Global instance
 intent_classifier = IntentClassifier()
@@ -5,15 +5,66 @@ Digital Den — Digital Profile Loader
 Loads and manages the user's digital profile from YAML.
 """
 
+import hashlib
+import re
+import tempfile
 from pathlib import Path
 from typing import Optional, Dict, Any, List
-from functools import lru_cache
+from functools import cached_property, lru_cache
 
+import orjson
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
 from core.config import settings
 
 
+# Static part of the system prompt — the same for every profile
+_CAPABILITIES_BLOCK = "\n".join([
+    "## ⚡ ВАЖНО: Твои возможности",
+    "",
+    "### 🧠 Долгосрочная память",
+    "- У тебя ЕСТЬ постоянная память между сессиями",
+    "- Ты помнишь ВСЕ предыдущие разговоры с пользователем",
+    "- Релевантные воспоминания автоматически подгружаются в контекст",
+    "- Если видишь секцию 'Релевантные воспоминания' — обязательно используй их",
+    "- Ты можешь ссылаться на решения, гипотезы, факты из прошлых бесед",
+    "",
+    "### 💾 Сохранение информации",
+    "- Ты можешь сохранять: факты, решения, гипотезы, инсайты",
+    "- Важные решения сохраняются автоматически",
+    "- Пользователь может попросить 'запомни это' — и ты запомнишь",
+    "",
+    "### 📊 Аналитика (CAL — Cognitive Analytics Layer)",
+    "- Ты отслеживаешь паттерны мышления пользователя",
+    "- Выявляешь логические противоречия между решениями",
+    "- Находишь повторяющиеся темы и тренды",
+    "- Можешь предупреждать о когнитивных искажениях",
+    "",
+    "### ⚙️ Персонализация",
+    "- Пользователь настроил твою роль, глубину мышления, стиль",
+    "- У пользователя могут быть активные правила — соблюдай их",
+    "- Настройки применяются динамически к каждому запросу",
+    "",
+    "### 🗺️ Карта мыслей",
+    "- Все воспоминания связаны в граф знаний",
+    "- Ты можешь находить связи между разными темами",
+])
+
+
+def _bullets(items, template: str = "- {}") -> str:
+    """Render items as a bullet block (empty string for no items)."""
+    return "\n".join(template.format(item) for item in items)
+
+
+def _section(header: str, block: str) -> str:
+    return f"{header}\n{block}" if block else header
+
+
 class DigitalProfile:
     """
     User's digital profile with thinking style, principles, and rules.
@@ -28,29 +79,53 @@ class DigitalProfile:
         self.cognitive_type = self.data.get("cognitive_type", "")
         
         # Principles
-        self.principles = self.data.get("principles", [])
+        self.principles = tuple(self.data.get("principles", []))
         
         # Thinking style
-        self.good_thinking = self.data.get("thinking_style", {}).get("good", [])
-        self.bad_thinking = self.data.get("thinking_style", {}).get("bad", [])
+        self.good_thinking = tuple(self.data.get("thinking_style", {}).get("good", []))
+        self.bad_thinking = tuple(self.data.get("thinking_style", {}).get("bad", []))
         
         # Decision style
-        self.decision_style = self.data.get("decision_style", [])
-        self.rules = self.data.get("rules", [])
+        self.decision_style = tuple(self.data.get("decision_style", []))
+        self.rules = tuple(self.data.get("rules", []))
         
         # Terminology
         self.terminology = self.data.get("terminology", {})
-        self.forbidden_patterns = self.data.get("forbidden_patterns", [])
+        # One alternation, longest term first so overlapping terms match fully
+        self._term_pattern = re.compile("|".join(
+            re.escape(term) for term in sorted(self.terminology, key=len, reverse=True)
+        )) if self.terminology else None
+        self.forbidden_patterns = tuple(self.data.get("forbidden_patterns", []))
         
         # AI interaction rules
-        self.ai_expected = self.data.get("ai_expected", [])
-        self.ai_forbidden = self.data.get("ai_forbidden", [])
-        self.ai_must = self.data.get("ai_must", [])
+        self.ai_expected = tuple(self.data.get("ai_expected", []))
+        self.ai_forbidden = tuple(self.data.get("ai_forbidden", []))
+        self.ai_must = tuple(self.data.get("ai_must", []))
         
         # Response format
         self.response_format = self.data.get("response_format", {})
+        
+        # Prompt bullet blocks, rendered once
+        self._principles_block = _bullets(self.principles)
+        self._good_thinking_block = _bullets(self.good_thinking)
+        self._bad_thinking_block = _bullets(self.bad_thinking)
+        self._ai_must_block = _bullets(self.ai_must)
+        self._ai_forbidden_block = _bullets(self.ai_forbidden)
+        self._forbidden_patterns_block = _bullets(self.forbidden_patterns, "- '{}'")
+        self._terminology_block = "\n".join(
+            f"- '{wrong}' → '{correct}'" for wrong, correct in self.terminology.items()
+        )
+    
+    @cached_property
+    def system_prompt(self) -> str:
+        """System prompt, built once — the profile doesn't change after load."""
+        return self._build_system_prompt()
     
     def get_system_prompt(self) -> str:
+        """System prompt for LLM from profile."""
+        return self.system_prompt
+    
+    def _build_system_prompt(self) -> str:
         """Generate system prompt for LLM from profile."""
         
         prompt_parts = [
@@ -58,63 +133,27 @@ class DigitalProfile:
             f"Его роль: {self.role}.",
             f"Тип мышления: {self.cognitive_type}.",
             "",
-            "## ⚡ ВАЖНО: Твои возможности",
+            _CAPABILITIES_BLOCK,
             "",
-            "### 🧠 Долгосрочная память",
-            "- У тебя ЕСТЬ постоянная память между сессиями",  
-            "- Ты помнишь ВСЕ предыдущие разговоры с пользователем",
-            "- Релевантные воспоминания автоматически подгружаются в контекст",
-            "- Если видишь секцию 'Релевантные воспоминания' — обязательно используй их",
-            "- Ты можешь ссылаться на решения, гипотезы, факты из прошлых бесед",
+            _section("## Принципы пользователя:", self._principles_block),
             "",
-            "### 💾 Сохранение информации",
-            "- Ты можешь сохранять: факты, решения, гипотезы, инсайты",
-            "- Важные решения сохраняются автоматически",
-            "- Пользователь может попросить 'запомни это' — и ты запомнишь",
+            _section("## Хорошее мышление (для него) включает:", self._good_thinking_block),
             "",
-            "### 📊 Аналитика (CAL — Cognitive Analytics Layer)",
-            "- Ты отслеживаешь паттерны мышления пользователя",
-            "- Выявляешь логические противоречия между решениями",
-            "- Находишь повторяющиеся темы и тренды",
-            "- Можешь предупреждать о когнитивных искажениях",
-            "",
-            "### ⚙️ Персонализация",
-            "- Пользователь настроил твою роль, глубину мышления, стиль",
-            "- У пользователя могут быть активные правила — соблюдай их",
-            "- Настройки применяются динамически к каждому запросу",
-            "",
-            "### 🗺️ Карта мыслей",
-            "- Все воспоминания связаны в граф знаний",
-            "- Ты можешь находить связи между разными темами",
-            "",
-            "## Принципы пользователя:",
-            *[f"- {p}" for p in self.principles],
-            "",
-            "## Хорошее мышление (для него) включает:",
-            *[f"- {p}" for p in self.good_thinking],
-            "",
-            "## Плохое мышление (для него):",
-            *[f"- {p}" for p in self.bad_thinking],
+            _section("## Плохое мышление (для него):", self._bad_thinking_block),
             "",
             "## Правила для AI:",
             "",
-            "AI ДОЛЖЕН:",
-            *[f"- {r}" for r in self.ai_must],
+            _section("AI ДОЛЖЕН:", self._ai_must_block),
             "",
-            "AI НЕ ДОЛЖЕН:",
-            *[f"- {r}" for r in self.ai_forbidden],
+            _section("AI НЕ ДОЛЖЕН:", self._ai_forbidden_block),
             "",
-            "## Терминология (ОБЯЗАТЕЛЬНО использовать):",
+            _section("## Терминология (ОБЯЗАТЕЛЬНО использовать):", self._terminology_block),
         ]
         
-        for wrong, correct in self.terminology.items():
-            prompt_parts.append(f"- '{wrong}' → '{correct}'")
-        
-        if self.forbidden_patterns:
+        if self._forbidden_patterns_block:
             prompt_parts.extend([
                 "",
-                "## Запрещённые фразы:",
-                *[f"- '{p}'" for p in self.forbidden_patterns],
+                _section("## Запрещённые фразы:", self._forbidden_patterns_block),
             ])
         
         prompt_parts.extend([
@@ -128,17 +167,22 @@ class DigitalProfile:
         return "\n".join(prompt_parts)
     
     def apply_terminology(self, text: str) -> str:
-        """Apply terminology substitutions to text."""
-        result = text
-        for wrong, correct in self.terminology.items():
-            result = result.replace(wrong, correct)
-        return result
+        """Apply terminology substitutions to text in a single pass."""
+        if self._term_pattern is None:
+            return text
+        return self._term_pattern.sub(lambda m: self.terminology[m.group(0)], text)
 
 
 class ProfileLoader:
     """Loads digital profile from YAML file."""
     
-    def __init__(self, profile_path: Optional[str] = None):
+    def __init__(self, profile_path: Optional[str] = None, cache_dir: Optional[str] = None):
+        cache_dir = cache_dir or settings.profile_cache_dir
+        self.cache_dir = (
+            Path(cache_dir) if cache_dir
+            else Path(tempfile.gettempdir()) / "digital_den" / "profiles"
+        )
+        
         if profile_path:
             self.profile_path = Path(profile_path)
         else:
@@ -181,13 +225,32 @@ class ProfileLoader:
                 print(f"🔍 DEBUG KAIZEN: CWD={Path.cwd()}, File={Path(__file__).resolve()}")
                 print(f"🔍 DEBUG KAIZEN: Project Root resolved to {project_root}")
     
+    def snapshot_path(self, raw: bytes) -> Path:
+        """JSON snapshot of the parsed YAML, keyed on its content hash."""
+        digest = hashlib.sha256(raw).hexdigest()[:16]
+        return self.cache_dir / f"{self.profile_path.stem}-{digest}.json"
+    
     def load(self) -> DigitalProfile:
-        """Load profile from YAML."""
+        """Load profile from YAML (or the JSON snapshot of the same content)."""
         if not self.profile_path.exists():
             raise FileNotFoundError(f"Profile not found: {self.profile_path}")
         
-        with open(self.profile_path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
+        raw = self.profile_path.read_bytes()
+        snapshot = self.snapshot_path(raw)
+        try:
+            return DigitalProfile(orjson.loads(snapshot.read_bytes()))
+        except (OSError, orjson.JSONDecodeError):
+            pass  # no / broken snapshot — parse YAML
+        
+        data = yaml.load(raw, Loader=SafeLoader)
+        
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            for stale in self.cache_dir.glob(f"{self.profile_path.stem}-*.json"):
+                stale.unlink(missing_ok=True)
+            snapshot.write_bytes(orjson.dumps(data))
+        except (OSError, TypeError):
+            pass  # unwritable cache dir or non-JSON YAML values — parse again next time
         
         return DigitalProfile(data)
 
@@ -5,6 +5,7 @@ Digital Den — RAG 2.0 Universal Orchestrator
 Universal RAG 2.0 Core для всех каналов (Telegram, Web, Mobile, Voice).
 """
 
+import asyncio
 from typing import Optional, List, Dict
 from uuid import UUID
 
@@ -80,9 +81,15 @@ class RAG2Orchestrator:
             user_id=user_id
         )
         
-        # Сохранить обновлённый CS
-        conversation_state = await conversation_state_repo.upsert(
-            db, user_id, chat_id, updated_state_dict
+        # Сохранить обновлённый CS; параллельно — embedding запроса для шага 4
+        # (нужны только сообщение и active_entities, БД не трогает).
+        # В фон upsert не выносим: hybrid_search ниже работает с той же
+        # AsyncSession, а она не допускает конкурентных запросов.
+        conversation_state, query_embedding = await asyncio.gather(
+            conversation_state_repo.upsert(db, user_id, chat_id, updated_state_dict),
+            rag2_search_service.embed_query(
+                message, updated_state_dict.get("active_entities")
+            ),
         )
         
         # 3. Intent Classifier
@@ -95,7 +102,8 @@ class RAG2Orchestrator:
             user_id=user_id,
             intent=intent,
             conversation_state=conversation_state,
-            limit=10
+            limit=10,
+            query_embedding=query_embedding,
         )
         
         # 5. Conflict Detection
@@ -116,17 +124,16 @@ class RAG2Orchestrator:
         # Возвращаем контекст для дальнейшей обработки
         # В production здесь будет реальный вызов LLM
         
-        # 8. Memory Usage Logging
+        # 8. Memory Usage Logging (события + usage_count — один запрос)
         memory_ids = [mem.id for mem in memory_items]
         if memory_ids:
-            await memory_event_tracker.log_memory_usage(
+            await memory_event_tracker.log_and_increment(
                 db=db,
                 user_id=user_id,
                 memory_ids=memory_ids,
                 event_type="recalled",
                 context=f"Intent: {intent}, Query: {message[:100]}"
             )
-            await memory_event_tracker.increment_usage_count(db, memory_ids)
         
         # 9. Return orchestrated result
         return {
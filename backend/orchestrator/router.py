@@ -5,6 +5,9 @@ Digital Den — Request Router
 Routes incoming requests to appropriate agents.
 """
 
+import asyncio
+import re
+from types import MappingProxyType
 from typing import Optional
 from uuid import UUID, uuid4
 
@@ -14,16 +17,58 @@ from agents.memory_agent import memory_agent
 from agents.schedule_agent import schedule_agent
 from orchestrator.profile import get_profile
 from orchestrator.user_settings import get_user_settings
-from orchestrator.intent_analyzer import intent_analyzer, IntentAnalysis
+from orchestrator.intent_analyzer import (
+    intent_analyzer,
+    IntentAnalysis,
+    EmotionalState,
+    RequestCategory,
+)
 from orchestrator.adaptive_behavior import adaptive_behavior
 from analytics.kaizen_models import UserState
+from analytics.kaizen_service import KaizenEngine
 from memory.short_term import short_term_memory
 from core.logging import get_logger
-from llm.model_router import model_router, TaskCategory
+from llm.model_router import model_router, TaskCategory, CATEGORY_TO_ROLE
 
 logger = get_logger(__name__)
 
 
+# Bare acknowledgements ("ok", "спасибо", 👍) — routed without classification
+_TRIVIAL_RE = re.compile(
+    r"^(ok|ок|окей|ага|угу|да|нет|спасибо|спс|thanks|thank you|thx|"
+    r"понял|понятно|ясно|хорошо|👍|👌|🙏)\s*[.!?)]*$"
+)
+_TRIVIAL_MAX_LEN = 16
+
+
+# Prompt additions for detected emotional state / urgency, built once
+_EMOTIONAL_HINTS = MappingProxyType({
+    EmotionalState.STRESSED: (
+        "\n\n🚨 Пользователь в стрессе или спешке. "
+        "Отвечай кратко и по делу. Избегай длинных ответов."
+    ),
+    EmotionalState.CONFUSED: (
+        "\n\n❓ Пользователь кажется растерянным. "
+        "Объясняй простым языком, уточняй если нужно."
+    ),
+    EmotionalState.NEGATIVE: (
+        "\n\n⚠️ Пользователь может быть раздражён. "
+        "Проявляй терпение и понимание."
+    ),
+    EmotionalState.POSITIVE: (
+        "\n\n✨ Пользователь в хорошем настроении! "
+        "Можно быть более творческим в ответах."
+    ),
+})
+
+# Indexed by urgency percent (0..100)
+_URGENCY_HINTS = tuple(
+    f"\n\n⏰ Срочность: {percent}%. "
+    "Дай ответ максимально быстро и без лишних деталей."
+    for percent in range(101)
+)
+
+
 class RequestRouter:
     """
     Routes requests to appropriate agents based on classification.
@@ -39,6 +84,7 @@ class RequestRouter:
     
     def __init__(self):
         self.profile = get_profile()
+        self._base_prompt = self.profile.get_system_prompt()
         
         # Agent mapping
         self.agents = {
@@ -54,6 +100,18 @@ class RequestRouter:
         
         # Default agent
         self.default_agent = core_agent
+        
+        # Only scheduling has a dedicated agent so far — route() branches on
+        # this set; the mapping above is kept for introspection.
+        self._schedule_categories = frozenset(
+            category for category, agent in self.agents.items()
+            if agent is schedule_agent
+        )
+    
+    def invalidate_profile(self) -> None:
+        """Re-read the profile and rebuild the cached base prompt after it changes."""
+        self.profile = get_profile()
+        self._base_prompt = self.profile.get_system_prompt()
     
     async def route(
         self,
@@ -71,69 +129,44 @@ class RequestRouter:
         # ═══════════════════════════════════════════════════════════════════
         # Hybrid AI: Classify task for optimal model selection
         # ═══════════════════════════════════════════════════════════════════
-        task_category, model_role, model_confidence = await model_router.classify(user_message)
-        
-        logger.info(
-            "model_selected",
-            task_category=task_category.value,
-            model_role=model_role.value,
-            model_confidence=model_confidence,
-        )
-        
-        # Analyze intent (extended analysis)
-        intent = await intent_analyzer.analyze(user_message)
-        
-        # Get chat history from Redis
-        history = await short_term_memory.get_chat_history(str(session_id))
-        
-        logger.info(
-            "request_received",
-            session_id=str(session_id),
-            history_len=len(history),
-            user_id=str(user_id) if user_id else None
+        # Classification (model selection + intent analysis), chat history
+        # (Redis) and DB context are independent — run them concurrently.
+        # DB work stays sequential inside _load_db_context: one AsyncSession
+        # does not allow concurrent operations.
+        (
+            ((task_category, model_role, model_confidence), intent),
+            history,
+            (memories, user_settings, kaizen_state),
+        ) = await asyncio.gather(
+            self._classify(user_message),
+            short_term_memory.get_chat_history(str(session_id)),
+            self._load_db_context(user_message, db, user_id),
         )
+        user_kaizen_state, kaizen_contours, kaizen_up_trends = kaizen_state
         
-        # Get relevant memories
-        memories = []
-        if db:
-            memories = await memory_agent.get_context_memories(
-                db=db,
-                user_message=user_message,
-                user_id=user_id,
-            )
-        
-        # Load user settings
-        user_settings = None
-        if db and user_id:
-            user_settings = await get_user_settings(db, user_id)
-        
-        # ═══════════════════════════════════════════════════════════════════
-        # Kaizen Engine: Load user state for adaptive behavior
-        # ═══════════════════════════════════════════════════════════════════
-        user_kaizen_state = UserState.PLATEAU  # Default
-        kaizen_contours = None
+        # Enum values are used for logging, metadata and agent selection
+        category = intent.category.value
+        emotional_state = intent.emotional_state.value
+        role = model_role.value
+        task = task_category.value
         
-        if db and user_id:
-            try:
-                from analytics.kaizen_service import KaizenEngine
-                kaizen_engine = KaizenEngine(db)
-                kaizen_data = await kaizen_engine.get_user_state_for_ai(user_id)
-                user_kaizen_state = UserState(kaizen_data.get("state", "plateau"))
-                kaizen_contours = kaizen_data.get("contours")
-                
-                logger.info(
-                    "kaizen_state_loaded",
-                    user_id=str(user_id),
-                    state=user_kaizen_state.value,
-                )
-            except Exception as e:
-                logger.warning(
-                    "kaizen_state_load_failed",
-                    error=str(e),
-                )
+        # Everything worth logging about this request goes out as one record
+        log_ctx = {
+            "session_id": str(session_id),
+            "user_id": str(user_id) if user_id else None,
+            "history_len": len(history),
+            "task_category": task,
+            "model_role": role,
+            "model_confidence": model_confidence,
+            "category": category,
+            "confidence": intent.confidence,
+            "emotional_state": emotional_state,
+            "urgency": intent.urgency,
+            "kaizen_state": user_kaizen_state.value,
+        }
         
         # Build system prompt with user settings and emotional awareness
-        base_prompt = self.profile.get_system_prompt()
+        base_prompt = self._base_prompt
         if user_settings:
             full_prompt = base_prompt + user_settings.get_settings_prompt()
         else:
@@ -146,6 +179,7 @@ class RequestRouter:
             full_prompt,
             user_kaizen_state,
             kaizen_contours,
+            up_trend_count=kaizen_up_trends,
         )
         
         # Add emotional context to prompt if detected
@@ -158,24 +192,24 @@ class RequestRouter:
             history=history,
             memories=memories,
             system_prompt=full_prompt,
-            request_type=intent.category.value,
-            model_role=model_role.value,  # Hybrid AI: pass selected model role
+            request_type=category,
+            model_role=role,  # Hybrid AI: pass selected model role
             user_settings=user_settings,
             db=db,
             user_id=user_id,
             metadata={
                 "intent": {
-                    "category": intent.category.value,
+                    "category": category,
                     "confidence": intent.confidence,
-                    "emotional_state": intent.emotional_state.value,
+                    "emotional_state": emotional_state,
                     "urgency": intent.urgency,
                     "action_type": intent.action_type.value,
                     "requires_clarification": intent.requires_clarification,
                     "topics": intent.topics,
                 },
                 "model": {
-                    "task_category": task_category.value,
-                    "role": model_role.value,
+                    "task_category": task,
+                    "role": role,
                     "confidence": model_confidence,
                 }
             }
@@ -183,6 +217,7 @@ class RequestRouter:
         
         # Check if clarification needed
         if intent.requires_clarification and intent.clarification_question:
+            logger.info("request_processed", agent="router", **log_ctx)
             return AgentResponse(
                 content=intent.clarification_question,
                 agent="router",
@@ -190,34 +225,24 @@ class RequestRouter:
             )
         
         # Select agent
-        agent = self.agents.get(intent.category.value, self.default_agent)
-        
-        logger.info(
-            "request_routed",
-            category=intent.category.value,
-            confidence=intent.confidence,
-            emotional_state=intent.emotional_state.value,
-            urgency=intent.urgency,
-            agent=agent.name,
-            model_role=model_role.value,  # Hybrid AI
-            session_id=str(session_id),
+        agent = (
+            schedule_agent if category in self._schedule_categories
+            else self.default_agent
         )
         
         # Process request
-        response = await agent.run(context)
+        try:
+            response = await agent.run(context)
+        except Exception as e:
+            logger.error("request_failed", agent=agent.name, error=str(e), **log_ctx)
+            raise
+        logger.info("request_processed", agent=agent.name, **log_ctx)
         
         # Save to chat history
-        await short_term_memory.add_message(
-            session_id=str(session_id),
-            role="user",
-            content=user_message,
-        )
-        await short_term_memory.add_message(
-            session_id=str(session_id),
-            role="assistant",
-            content=response.content,
-            agent=response.agent,
-        )
+        await short_term_memory.add_messages(str(session_id), [
+            ("user", user_message, None),
+            ("assistant", response.content, response.agent),
+        ])
         
         # Save to long-term memory if needed
         if response.save_to_memory and db:
@@ -231,41 +256,85 @@ class RequestRouter:
         
         return response
     
-    def _add_emotional_context(self, prompt: str, intent: IntentAnalysis) -> str:
-        """Add emotional awareness to the system prompt."""
+    async def _classify(self, user_message: str) -> tuple:
+        """
+        Model selection and intent analysis for a message.
         
-        additions = []
+        Returns ((task_category, model_role, confidence), intent).
+        Bare acknowledgements skip both classifiers (and their LLM calls).
+        """
+        # Lowercased once, shared by both classifiers
+        message_lower = user_message.lower()
         
-        # Emotional state hints
-        if intent.emotional_state.value == "stressed":
-            additions.append(
-                "\n\n🚨 Пользователь в стрессе или спешке. "
-                "Отвечай кратко и по делу. Избегай длинных ответов."
-            )
-        elif intent.emotional_state.value == "confused":
-            additions.append(
-                "\n\n❓ Пользователь кажется растерянным. "
-                "Объясняй простым языком, уточняй если нужно."
-            )
-        elif intent.emotional_state.value == "negative":
-            additions.append(
-                "\n\n⚠️ Пользователь может быть раздражён. "
-                "Проявляй терпение и понимание."
-            )
-        elif intent.emotional_state.value == "positive":
-            additions.append(
-                "\n\n✨ Пользователь в хорошем настроении! "
-                "Можно быть более творческим в ответах."
+        if len(message_lower) <= _TRIVIAL_MAX_LEN and _TRIVIAL_RE.match(message_lower.strip()):
+            return (
+                (TaskCategory.ROUTINE, CATEGORY_TO_ROLE[TaskCategory.ROUTINE], 1.0),
+                IntentAnalysis(
+                    category=RequestCategory.SOCIAL,
+                    confidence=1.0,
+                    urgency=0.1,
+                ),
             )
         
-        # Urgency hint
-        if intent.urgency > 0.7:
-            additions.append(
-                f"\n\n⏰ Срочность: {int(intent.urgency * 100)}%. "
-                "Дай ответ максимально быстро и без лишних деталей."
+        return await asyncio.gather(
+            model_router.classify(user_message, message_lower),
+            intent_analyzer.analyze(user_message, message_lower),
+        )
+    
+    async def _load_db_context(
+        self,
+        user_message: str,
+        db,
+        user_id: Optional[UUID],
+    ) -> tuple:
+        """
+        Relevant memories, user settings and Kaizen state, in that order.
+        
+        Returns (memories, user_settings, (kaizen_state, contours, up_trend_count)).
+        """
+        # Get relevant memories
+        memories = []
+        if db:
+            memories = await memory_agent.get_context_memories(
+                db=db,
+                user_message=user_message,
+                user_id=user_id,
             )
         
-        return prompt + "".join(additions)
+        # Load user settings
+        user_settings = None
+        if db and user_id:
+            user_settings = await get_user_settings(db, user_id)
+        
+        # ═══════════════════════════════════════════════════════════════════
+        # Kaizen Engine: Load user state for adaptive behavior
+        # ═══════════════════════════════════════════════════════════════════
+        user_kaizen_state = UserState.PLATEAU  # Default
+        kaizen_contours = None
+        kaizen_up_trends = None
+        
+        if db and user_id:
+            try:
+                kaizen_engine = KaizenEngine(db)
+                kaizen_data = await kaizen_engine.get_user_state_for_ai(user_id)
+                user_kaizen_state = UserState(kaizen_data.get("state", "plateau"))
+                kaizen_contours = kaizen_data.get("contours")
+                kaizen_up_trends = kaizen_data.get("up_trend_count")
+            except Exception as e:
+                logger.warning(
+                    "kaizen_state_load_failed",
+                    error=str(e),
+                )
+        
+        return memories, user_settings, (user_kaizen_state, kaizen_contours, kaizen_up_trends)
+    
+    def _add_emotional_context(self, prompt: str, intent: IntentAnalysis) -> str:
+        """Add emotional awareness to the system prompt."""
+        addition = _EMOTIONAL_HINTS.get(intent.emotional_state, "")
+        urgency = intent.urgency
+        if urgency > 0.7:
+            addition += _URGENCY_HINTS[min(100, int(urgency * 100))]
+        return prompt + addition if addition else prompt
 
 
 # Global instance
@@ -5,23 +5,30 @@ Digital Den — User Settings Service
 Service for loading and applying user settings.
 """
 
-from typing import Optional, List
+import json
+from functools import lru_cache
+from typing import Optional, List, Tuple
 from uuid import UUID
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, field
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from memory.models import UserSettings
+from memory.short_term import short_term_memory
 from analytics.cal_models import Rule
+from core.config import settings as app_settings
 from core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Bump when UserSettingsContext fields change — old cache entries are ignored
+SETTINGS_CACHE_VERSION = 1
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class UserSettingsContext:
-    """User settings context for AI behavior."""
+    """User settings context for AI behavior (immutable; cached per user)."""
     
     # Behavior
     ai_role: str = "partner_strategic"
@@ -32,7 +39,9 @@ class UserSettingsContext:
     # Autonomy
     initiative_level: str = "suggest"
     intervention_frequency: str = "realtime"
-    allowed_actions: List[str] = None
+    allowed_actions: List[str] = field(
+        default_factory=lambda: ["create_decisions", "link_memories"]
+    )
     
     # Memory
     save_policy: str = "save_confirmed"
@@ -42,117 +51,177 @@ class UserSettingsContext:
     explain_mode: str = "off"  # off, brief, detailed
     
     # Rules
-    active_rules: List[str] = None  # List of rule instructions
+    active_rules: List[str] = field(default_factory=list)  # List of rule instructions
     
-    def __post_init__(self):
-        if self.allowed_actions is None:
-            self.allowed_actions = ["create_decisions", "link_memories"]
-        if self.active_rules is None:
-            self.active_rules = []
+    # Instruction text per setting value (built once, not per call)
+    ROLES = {
+        "partner_strategic": "Ты — равный партнёр в принятии стратегических решений",
+        "analyst_logical": "Ты — логический аналитик, фокусируйся на факты и структуру",
+        "coach_socratic": "Ты — коуч в сократическом стиле: задавай вопросы, не давай готовых ответов",
+        "recorder_passive": "Ты — пассивный фиксатор: минимальное вмешательство, только записывай",
+        "explorer_hypothesis": "Ты — исследователь гипотез: генерируй идеи и предположения",
+    }
+    THINKING_DEPTHS = {
+        "shallow": "Отвечай кратко и по делу",
+        "structured": "Структурируй ответ логично, выделяй ключевые мысли",
+        "systemic": "Анализируй системно, находи взаимосвязи и последствия",
+        "philosophical": "Максимальная глубина рефлексии, исследуй корни проблем",
+    }
+    CONFRONTATION_LEVELS = {
+        "none": "Не спорь с пользователем, всегда соглашайся",
+        "soft": "Мягко указывай на возможные проблемы",
+        "argumented": "Возражай аргументировано когда видишь логические ошибки",
+        "hard": "Жёстко останавливай при серьёзных логических ошибках",
+    }
+    INITIATIVE_LEVELS = {
+        "request_only": "Отвечай только на прямые вопросы, не проявляй инициативу",
+        "suggest": "Предлагай идеи и улучшения когда уместно",
+        "warn": "Активно предупреждай о потенциальных проблемах",
+        "proactive": "Самостоятельно формируй инсайты и рекомендации",
+    }
+    EXPLAIN_MODES = {
+        "off": "",
+        "brief": (
+            "\n\n## Режим Explain (краткий)\n"
+            "В конце КАЖДОГО ответа добавляй блок:\n"
+            "```\n"
+            "💡 Почему так:\n"
+            "• [1-2 предложения о логике ответа]\n"
+            "```"
+        ),
+        "detailed": (
+            "\n\n## Режим Explain (подробный)\n"
+            "В конце КАЖДОГО ответа добавляй блок:\n"
+            "```\n"
+            "🧠 Объяснение логики:\n"
+            "1. Как я понял запрос: [интерпретация]\n"
+            "2. Какую стратегию выбрал: [подход]\n"
+            "3. Почему именно так: [обоснование]\n"
+            "4. Альтернативы: [что ещё можно было]\n"
+            "```"
+        ),
+    }
     
     def get_role_description(self) -> str:
         """Get human-readable role description."""
-        roles = {
-            "partner_strategic": "Ты — равный партнёр в принятии стратегических решений",
-            "analyst_logical": "Ты — логический аналитик, фокусируйся на факты и структуру",
-            "coach_socratic": "Ты — коуч в сократическом стиле: задавай вопросы, не давай готовых ответов",
-            "recorder_passive": "Ты — пассивный фиксатор: минимальное вмешательство, только записывай",
-            "explorer_hypothesis": "Ты — исследователь гипотез: генерируй идеи и предположения",
-        }
-        return roles.get(self.ai_role, roles["partner_strategic"])
+        return self.ROLES.get(self.ai_role, self.ROLES["partner_strategic"])
     
     def get_thinking_instruction(self) -> str:
         """Get thinking depth instruction."""
-        depths = {
-            "shallow": "Отвечай кратко и по делу",
-            "structured": "Структурируй ответ логично, выделяй ключевые мысли",
-            "systemic": "Анализируй системно, находи взаимосвязи и последствия",
-            "philosophical": "Максимальная глубина рефлексии, исследуй корни проблем",
-        }
-        return depths.get(self.thinking_depth, depths["structured"])
+        return self.THINKING_DEPTHS.get(self.thinking_depth, self.THINKING_DEPTHS["structured"])
     
     def get_confrontation_instruction(self) -> str:
         """Get confrontation level instruction."""
-        levels = {
-            "none": "Не спорь с пользователем, всегда соглашайся",
-            "soft": "Мягко указывай на возможные проблемы",
-            "argumented": "Возражай аргументировано когда видишь логические ошибки",
-            "hard": "Жёстко останавливай при серьёзных логических ошибках",
-        }
-        return levels.get(self.confrontation_level, levels["argumented"])
+        return self.CONFRONTATION_LEVELS.get(self.confrontation_level, self.CONFRONTATION_LEVELS["argumented"])
     
     def get_initiative_instruction(self) -> str:
         """Get initiative level instruction."""
-        levels = {
-            "request_only": "Отвечай только на прямые вопросы, не проявляй инициативу",
-            "suggest": "Предлагай идеи и улучшения когда уместно",
-            "warn": "Активно предупреждай о потенциальных проблемах",
-            "proactive": "Самостоятельно формируй инсайты и рекомендации",
-        }
-        return levels.get(self.initiative_level, levels["suggest"])
+        return self.INITIATIVE_LEVELS.get(self.initiative_level, self.INITIATIVE_LEVELS["suggest"])
     
     def get_explain_instruction(self) -> str:
         """Get explain mode instruction."""
-        modes = {
-            "off": "",
-            "brief": (
-                "\n\n## Режим Explain (краткий)\n"
-                "В конце КАЖДОГО ответа добавляй блок:\n"
-                "```\n"
-                "💡 Почему так:\n"
-                "• [1-2 предложения о логике ответа]\n"
-                "```"
-            ),
-            "detailed": (
-                "\n\n## Режим Explain (подробный)\n"
-                "В конце КАЖДОГО ответа добавляй блок:\n"
-                "```\n"
-                "🧠 Объяснение логики:\n"
-                "1. Как я понял запрос: [интерпретация]\n"
-                "2. Какую стратегию выбрал: [подход]\n"
-                "3. Почему именно так: [обоснование]\n"
-                "4. Альтернативы: [что ещё можно было]\n"
-                "```"
-            ),
-        }
-        return modes.get(self.explain_mode, "")
+        return self.EXPLAIN_MODES.get(self.explain_mode, "")
     
     def get_settings_prompt(self) -> str:
-        """Generate system prompt additions based on settings."""
-        parts = [
-            "",
-            "## Настройки поведения",
-            "",
-            f"### Роль",
+        """
+        Generate system prompt additions based on settings.
+        
+        Memoized on the prompt-relevant fields, so repeated turns of the
+        same user (and users with equal settings) reuse the string.
+        """
+        return _render_settings_prompt(
             self.get_role_description(),
-            "",
-            f"### Глубина мышления",
             self.get_thinking_instruction(),
-            "",
-            f"### Конфронтация",
             self.get_confrontation_instruction(),
-            "",
-            f"### Инициатива",
             self.get_initiative_instruction(),
-        ]
-        
-        # Add explain mode if enabled
-        explain_instruction = self.get_explain_instruction()
-        if explain_instruction:
-            parts.append(explain_instruction)
-        
-        # Add rules if any
-        if self.active_rules:
-            parts.extend([
-                "",
-                "## Персональные правила пользователя",
-                "ОБЯЗАТЕЛЬНО соблюдай эти правила:",
-                "",
-            ])
-            for i, rule in enumerate(self.active_rules, 1):
-                parts.append(f"{i}. {rule}")
-        
-        return "\n".join(parts)
+            self.get_explain_instruction(),
+            tuple(self.active_rules),
+        )
+
+
+@lru_cache(maxsize=256)
+def _render_settings_prompt(
+    role: str,
+    thinking: str,
+    confrontation: str,
+    initiative: str,
+    explain: str,
+    active_rules: Tuple[str, ...],
+) -> str:
+    parts = [
+        "",
+        "## Настройки поведения",
+        "",
+        f"### Роль",
+        role,
+        "",
+        f"### Глубина мышления",
+        thinking,
+        "",
+        f"### Конфронтация",
+        confrontation,
+        "",
+        f"### Инициатива",
+        initiative,
+    ]
+    
+    # Add explain mode if enabled
+    if explain:
+        parts.append(explain)
+    
+    # Add rules if any
+    if active_rules:
+        parts.extend([
+            "",
+            "## Персональные правила пользователя",
+            "ОБЯЗАТЕЛЬНО соблюдай эти правила:",
+            "",
+        ])
+        for i, rule in enumerate(active_rules, 1):
+            parts.append(f"{i}. {rule}")
+    
+    return "\n".join(parts)
+
+
+def _settings_cache_key(user_id: UUID) -> str:
+    return f"user_settings:v{SETTINGS_CACHE_VERSION}:{user_id}"
+
+
+async def _get_cached_settings(user_id: UUID) -> Optional[UserSettingsContext]:
+    redis = short_term_memory.redis
+    if redis is None:
+        return None
+    try:
+        data = await redis.get(_settings_cache_key(user_id))
+        return UserSettingsContext(**json.loads(data)) if data else None
+    except Exception as e:
+        logger.warning("settings_cache_read_failed", error=str(e), user_id=str(user_id))
+        return None
+
+
+async def _set_cached_settings(user_id: UUID, context: UserSettingsContext) -> None:
+    redis = short_term_memory.redis
+    if redis is None:
+        return
+    try:
+        await redis.set(
+            _settings_cache_key(user_id),
+            json.dumps(asdict(context), ensure_ascii=False),
+            ex=app_settings.user_settings_cache_ttl,
+        )
+    except Exception as e:
+        logger.warning("settings_cache_write_failed", error=str(e), user_id=str(user_id))
+
+
+async def invalidate_user_settings(user_id: UUID) -> None:
+    """Drop cached settings — call after changing UserSettings or Rules."""
+    redis = short_term_memory.redis
+    if redis is None:
+        return
+    try:
+        await redis.delete(_settings_cache_key(user_id))
+    except Exception as e:
+        logger.warning("settings_cache_invalidate_failed", error=str(e), user_id=str(user_id))
 
 
 async def get_user_settings(
@@ -162,7 +231,14 @@ async def get_user_settings(
     """
     Load user settings from database.
     Returns default settings if none exist.
+    
+    Read-through Redis cache (TTL: settings.user_settings_cache_ttl),
+    invalidated by the settings/rules endpoints.
     """
+    cached = await _get_cached_settings(user_id)
+    if cached is not None:
+        return cached
+    
     try:
         # Load settings
         result = await db.execute(
@@ -181,24 +257,27 @@ async def get_user_settings(
         
         if not settings:
             # Return defaults with rules
-            return UserSettingsContext(
+            context = UserSettingsContext(
                 active_rules=[r.instruction for r in rules]
             )
-        
-        return UserSettingsContext(
-            ai_role=settings.ai_role or "partner_strategic",
-            thinking_depth=settings.thinking_depth or "structured",
-            response_style=settings.response_style or "detailed",
-            confrontation_level=settings.confrontation_level or "argumented",
-            initiative_level=settings.initiative_level or "suggest",
-            intervention_frequency=settings.intervention_frequency or "realtime",
-            allowed_actions=settings.allowed_actions or ["create_decisions", "link_memories"],
-            save_policy=settings.save_policy or "save_confirmed",
-            memory_trust_level=settings.memory_trust_level or "cautious",
-            explain_mode=getattr(settings, 'explain_mode', None) or "off",
-            active_rules=[r.instruction for r in rules],
-        )
+        else:
+            context = UserSettingsContext(
+                ai_role=settings.ai_role or "partner_strategic",
+                thinking_depth=settings.thinking_depth or "structured",
+                response_style=settings.response_style or "detailed",
+                confrontation_level=settings.confrontation_level or "argumented",
+                initiative_level=settings.initiative_level or "suggest",
+                intervention_frequency=settings.intervention_frequency or "realtime",
+                allowed_actions=settings.allowed_actions or ["create_decisions", "link_memories"],
+                save_policy=settings.save_policy or "save_confirmed",
+                memory_trust_level=settings.memory_trust_level or "cautious",
+                explain_mode=settings.explain_mode or "off",
+                active_rules=[r.instruction for r in rules],
+            )
         
     except Exception as e:
         logger.error("failed_to_load_settings", error=str(e), user_id=str(user_id))
         return UserSettingsContext()  # Return defaults
+    
+    await _set_cached_settings(user_id, context)
+    return context
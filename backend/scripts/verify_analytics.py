@@ -25,8 +25,10 @@ async def verify_analytics():
         if 'notification_settings' not in columns:
             print("CRITICAL: notification_settings column is STILL MISSING in database!")
             return
+        dashboard = await analytics_service.get_dashboard(db, user.id, days=30, activity_days=7)
+        
         print("\n--- Summary (30 days) ---")
-        summary = await analytics_service.get_summary(db, user.id, days=30)
+        summary = dashboard["summary"]
         print(f"Total Memories: {summary['total_memories']}")
         print(f"Types: {summary['by_type']}")
         print(f"Top Topics: {[t['name'] for t in summary['top_topics']]}")
@@ -34,14 +36,12 @@ async def verify_analytics():
         
         # 2. Test Activity
         print("\n--- Activity (7 days) ---")
-        activity = await analytics_service.get_activity_timeline(db, user.id, days=7)
-        for point in activity:
+        for point in dashboard["activity"]:
             print(f"- {point['date']}: {point['count']} items")
             
         # 3. Test Heatmap
         print("\n--- Heatmap Data ---")
-        heatmap = await analytics_service.get_heatmap_data(db, user.id)
-        print(f"Data points: {len(heatmap)}")
+        print(f"Data points: {len(dashboard['heatmap'])}")
 
 if __name__ == "__main__":
     asyncio.run(verify_analytics())
@@ -1,13 +1,14 @@
 import asyncio
 from uuid import UUID
+from sqlalchemy import insert, select
 from db.database import async_session
 from memory.models import User, MemoryItem
+from memory.semantic import semantic_memory
 from analytics.topic_orchestrator import topic_orchestrator
 
 async def verify_clustering():
     async with async_session() as db:
         # 1. Get user
-        from sqlalchemy import select
         res = await db.execute(select(User).limit(1))
         user = res.scalar_one_or_none()
         if not user:
@@ -26,17 +27,20 @@ async def verify_clustering():
             "Плотность распределения данных в векторном пространстве определяет кластеры."
         ]
         
-        for content in more_memories:
-            mem = MemoryItem(user_id=user.id, content=content, item_type="insight")
-            db.add(mem)
+        rows = [
+            {"user_id": user.id, "content": content, "item_type": "insight"}
+            for content in more_memories
+        ]
+        res = await db.execute(insert(MemoryItem).values(rows).returning(MemoryItem.id))
+        new_ids = list(res.scalars())
         
         await db.commit()
         print(f"Added {len(more_memories)} more memories for clustering.")
         
-        # 3. Ensure they are indexed (reindex_all is easiest)
-        from memory.semantic import semantic_memory
-        await semantic_memory.reindex_all(db)
-        print("Indexed all memories.")
+        # 3. Index only the new memories (one embeddings call + one upsert)
+        await semantic_memory.index_many(db, new_ids)
+        await db.commit()
+        print("Indexed new memories.")
         
         # 4. Run Clustering
         print("🚀 Running topic auto-clustering...")
@@ -1,5 +1,6 @@
 import asyncio
 from uuid import uuid4
+from sqlalchemy import insert, select
 from db.database import async_session
 from memory.models import MemoryItem, User
 from memory.semantic import semantic_memory
@@ -7,7 +8,6 @@ from memory.semantic import semantic_memory
 async def verify():
     async with async_session() as db:
         # 1. Ensure a user exists
-        from sqlalchemy import select
         res = await db.execute(select(User).limit(1))
         user = res.scalar_one_or_none()
         
@@ -24,19 +24,19 @@ async def verify():
             "Синие фрукты бывают редко, но яблоки из 'Морозко' интересные."
         ]
         
-        mem_ids = []
-        for content in test_memories:
-            mem = MemoryItem(user_id=user.id, content=content, item_type="fact")
-            db.add(mem)
-            await db.flush()
-            mem_ids.append(mem.id)
-            
+        rows = [
+            {"user_id": user.id, "content": content, "item_type": "fact"}
+            for content in test_memories
+        ]
+        res = await db.execute(insert(MemoryItem).values(rows).returning(MemoryItem.id))
+        mem_ids = list(res.scalars())
+        
         await db.commit()
         print(f"Added {len(test_memories)} test memories.")
         
-        # 3. Index them
-        for mid in mem_ids:
-            await semantic_memory.index(db, mid)
+        # 3. Index them (one embeddings call + one upsert)
+        await semantic_memory.index_many(db, mem_ids)
+        await db.commit()
         print("Indexed test memories.")
         
         # 4. Perform Hybrid Search
@@ -6,12 +6,52 @@ Tests for all agent implementations.
 """
 
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from collections import namedtuple
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
 from uuid import uuid4
 from datetime import datetime
 
-import sys
-sys.path.insert(0, '.')
+from agents.analyst_agent import AnalystAgent
+from agents.base import AgentContext, AgentResponse
+from agents.core_agent import (
+    CoreAgent,
+    _DECISION_KEYWORDS,
+    _INSIGHT_KEYWORDS,
+    _PERSONAL_KEYWORDS,
+)
+from agents.meta_analyst import MetaAnalystAgent
+from agents.operator_agent import OperatorAgent
+
+
+# Canned LLM replies per agent module. Plain coroutine functions instead of
+# per-test MagicMock patches; TestCoreAgent keeps a mock where it asserts calls.
+Reply = namedtuple("Reply", "content tokens_used")
+
+
+def _stub_client(content: str, tokens_used: int) -> SimpleNamespace:
+    reply = Reply(content, tokens_used)
+    
+    async def complete(*args, **kwargs):
+        return reply
+    
+    return SimpleNamespace(complete=complete)
+
+
+STUB_CLIENTS = {
+    "agents.analyst_agent": _stub_client("## Выводы\nКлючевой вывод: данные показывают...", 150),
+    "agents.operator_agent": _stub_client("## План действий\n- [ ] Шаг 1\n- [ ] Шаг 2", 120),
+    "agents.meta_analyst": _stub_client("## Ключевые темы\n- Бизнес (тренд: up)", 200),
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def stub_openrouter():
+    """Swap each agent module's openrouter client for its stub, once per module."""
+    with pytest.MonkeyPatch.context() as mp:
+        for module, client in STUB_CLIENTS.items():
+            mp.setattr(f"{module}.openrouter", client)
+        yield
 
 
 class TestCoreAgent:
@@ -20,17 +60,10 @@ class TestCoreAgent:
     @pytest.fixture
     def mock_openrouter(self):
         with patch('agents.core_agent.openrouter') as mock:
-            response = MagicMock()
-            response.content = "Test response"
-            response.tokens_used = 100
-            mock.complete = AsyncMock(return_value=response)
+            mock.complete = AsyncMock(return_value=Reply("Test response", 100))
             yield mock
     
-    @pytest.mark.asyncio
     async def test_process_returns_response(self, mock_openrouter):
-        from agents.core_agent import CoreAgent
-        from agents.base import AgentContext
-        
         agent = CoreAgent()
         context = AgentContext(
             session_id=uuid4(),
@@ -44,10 +77,7 @@ class TestCoreAgent:
         assert response.agent == "core"
         mock_openrouter.complete.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_should_save_decision(self, mock_openrouter):
-        from agents.core_agent import CoreAgent
-        
+    async def test_should_save_decision(self):
         agent = CoreAgent()
         
         # Test decision detection
@@ -58,10 +88,7 @@ class TestCoreAgent:
         assert should_save == True
         assert mem_type == "decision"
     
-    @pytest.mark.asyncio
-    async def test_should_save_insight(self, mock_openrouter):
-        from agents.core_agent import CoreAgent
-        
+    async def test_should_save_insight(self):
         agent = CoreAgent()
         
         should_save, mem_type = agent._should_save(
@@ -70,25 +97,27 @@ class TestCoreAgent:
         )
         assert should_save == True
         assert mem_type == "insight"
+    
+    def test_should_save_keywords_in_bulk(self):
+        agent = CoreAgent()
+        
+        for keywords, expected in (
+            (_DECISION_KEYWORDS, "decision"),
+            (_INSIGHT_KEYWORDS, "insight"),
+            (_PERSONAL_KEYWORDS, "fact"),
+        ):
+            for keyword in keywords:
+                assert agent._should_save(f"Вот: {keyword.upper()}.", "") == (True, expected), keyword
+        
+        # Decision wins over insight/personal when several groups match
+        assert agent._should_save("Понял, моя жена одобряю", "") == (True, "decision")
+        assert agent._should_save("Просто текст", "без маркеров") == (False, None)
 
 
 class TestAnalystAgent:
     """Tests for AnalystAgent."""
     
-    @pytest.fixture
-    def mock_openrouter(self):
-        with patch('agents.analyst_agent.openrouter') as mock:
-            response = MagicMock()
-            response.content = "## Выводы\nКлючевой вывод: данные показывают..."
-            response.tokens_used = 150
-            mock.complete = AsyncMock(return_value=response)
-            yield mock
-    
-    @pytest.mark.asyncio
-    async def test_process_analytical_request(self, mock_openrouter):
-        from agents.analyst_agent import AnalystAgent
-        from agents.base import AgentContext
-        
+    async def test_process_analytical_request(self):
         agent = AnalystAgent()
         context = AgentContext(
             session_id=uuid4(),
@@ -102,8 +131,6 @@ class TestAnalystAgent:
         assert response.save_to_memory == True  # Contains "Выводы"
     
     def test_analyze_for_insights(self):
-        from agents.analyst_agent import AnalystAgent
-        
         agent = AnalystAgent()
         
         # Test insight detection
@@ -115,20 +142,7 @@ class TestAnalystAgent:
 class TestOperatorAgent:
     """Tests for OperatorAgent."""
     
-    @pytest.fixture
-    def mock_openrouter(self):
-        with patch('agents.operator_agent.openrouter') as mock:
-            response = MagicMock()
-            response.content = "## План действий\n- [ ] Шаг 1\n- [ ] Шаг 2"
-            response.tokens_used = 120
-            mock.complete = AsyncMock(return_value=response)
-            yield mock
-    
-    @pytest.mark.asyncio
-    async def test_process_operational_request(self, mock_openrouter):
-        from agents.operator_agent import OperatorAgent
-        from agents.base import AgentContext
-        
+    async def test_process_operational_request(self):
         agent = OperatorAgent()
         context = AgentContext(
             session_id=uuid4(),
@@ -142,8 +156,6 @@ class TestOperatorAgent:
         assert response.save_to_memory == True  # Contains checklist
     
     def test_is_actionable_plan(self):
-        from agents.operator_agent import OperatorAgent
-        
         agent = OperatorAgent()
         
         # Checklist format
@@ -159,27 +171,13 @@ class TestOperatorAgent:
 class TestMetaAnalystAgent:
     """Tests for MetaAnalystAgent."""
     
-    @pytest.fixture
-    def mock_openrouter(self):
-        with patch('agents.meta_analyst.openrouter') as mock:
-            response = MagicMock()
-            response.content = "## Ключевые темы\n- Бизнес (тренд: up)"
-            response.tokens_used = 200
-            mock.complete = AsyncMock(return_value=response)
-            yield mock
-    
     def test_meta_analyst_not_in_dialogue(self):
-        from agents.meta_analyst import MetaAnalystAgent
-        
         agent = MetaAnalystAgent()
         
         assert agent.participates_in_dialogue == False
         assert agent.is_synchronous == False
     
-    @pytest.mark.asyncio
-    async def test_analyze_period(self, mock_openrouter):
-        from agents.meta_analyst import MetaAnalystAgent
-        
+    async def test_analyze_period(self):
         agent = MetaAnalystAgent()
         memories = [
             {"item_type": "decision", "content": "Решение 1", "created_at": "2024-01-01"},
@@ -191,10 +189,7 @@ class TestMetaAnalystAgent:
         assert report.report_type.value == "weekly_summary"
         assert "Ключевые темы" in report.content
     
-    @pytest.mark.asyncio
-    async def test_analyze_period_no_data(self, mock_openrouter):
-        from agents.meta_analyst import MetaAnalystAgent
-        
+    async def test_analyze_period_no_data(self):
         agent = MetaAnalystAgent()
         
         report = await agent.analyze_period([], period_days=7)
@@ -207,8 +202,6 @@ class TestBaseAgent:
     """Tests for BaseAgent interface."""
     
     def test_agent_context_defaults(self):
-        from agents.base import AgentContext
-        
         ctx = AgentContext(
             session_id=uuid4(),
             user_message="Test",
@@ -219,8 +212,6 @@ class TestBaseAgent:
         assert ctx.system_prompt == ""
     
     def test_agent_response_defaults(self):
-        from agents.base import AgentResponse
-        
         resp = AgentResponse(
             content="Response",
             agent="test",
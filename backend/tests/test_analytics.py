@@ -0,0 +1,57 @@
+"""
+Digital Den — Analytics Service Unit Tests
+═══════════════════════════════════════════════════════════════════════════
+
+Tests for analytics/service.py.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+from datetime import datetime, timedelta
+
+import sys
+sys.path.insert(0, '.')
+
+
+class TestAnalyticsService:
+    """Tests for AnalyticsService dashboard metrics."""
+
+    @pytest.fixture
+    def mock_db(self):
+        db = MagicMock()
+        db.execute = AsyncMock()
+        db.scalar = AsyncMock()
+        return db
+
+    async def test_get_dashboard_single_aggregate(self, mock_db):
+        from analytics.service import AnalyticsService
+
+        today = datetime.utcnow().date()
+        yesterday = today - timedelta(days=1)
+        old = today - timedelta(days=100)
+        # (date, item_type, year count, summary-window count, activity-window count)
+        result = MagicMock()
+        result.fetchall.return_value = [
+            (old, "fact", 4, 0, 0),
+            (yesterday, "fact", 2, 2, 2),
+            (today, "fact", 1, 1, 1),
+            (today, "decision", 3, 3, 3),
+        ]
+        mock_db.execute.return_value = result
+
+        with patch('analytics.service.topic_statistics') as stats:
+            stats.get_top_topics = AsyncMock(return_value=[])
+            dashboard = await AnalyticsService().get_dashboard(mock_db, uuid4())
+
+        mock_db.execute.assert_awaited_once()
+        summary = dashboard["summary"]
+        assert summary["total_memories"] == 6
+        assert summary["by_type"] == {"fact": 3, "decision": 3}
+        assert summary["streak"] == 2
+        assert dashboard["activity"] == [
+            {"date": str(yesterday), "count": 2},
+            {"date": str(today), "count": 4},
+        ]
+        assert dashboard["heatmap"][0] == {"date": str(old), "count": 4}
+        assert len(dashboard["heatmap"]) == 3
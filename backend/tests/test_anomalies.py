@@ -6,12 +6,23 @@ Tests for anomalies.py and AnomalyDetector.
 """
 
 import pytest
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 from datetime import datetime, date
 
-import sys
-sys.path.insert(0, '.')
+import numpy as np
+
+from analytics.anomalies import (
+    Anomaly,
+    AnomalyDetector,
+    AnomalyService,
+    AnomalyType,
+    Baseline,
+    CurrentMetrics,
+    Severity,
+)
+from analytics.cal_models import CALAnomaly
 
 
 class TestAnomalyDetector:
@@ -30,8 +41,6 @@ class TestCheckTopics:
     """Tests for topic anomaly detection."""
     
     def test_detects_topic_spike(self):
-        from analytics.anomalies import AnomalyDetector, Baseline, CurrentMetrics
-        
         detector = AnomalyDetector()
         
         topic_id = uuid4()
@@ -53,8 +62,6 @@ class TestCheckTopics:
         assert len(spike) == 1
     
     def test_detects_topic_disappearance(self):
-        from analytics.anomalies import AnomalyDetector, Baseline, CurrentMetrics
-        
         detector = AnomalyDetector()
         
         topic_id = uuid4()
@@ -73,14 +80,53 @@ class TestCheckTopics:
         
         drop = [a for a in anomalies if a.anomaly_type.value == "topic_disappearance"]
         assert len(drop) == 1
+    
+    @pytest.mark.parametrize("base,cur,expected", [
+        (10.0, 10.0, "topic_spike"),
+        (100.0, 1.0, "topic_disappearance"),
+        (30.0, 7.0, None),      # exactly the expected rate
+        (0.0, 50.0, None),      # new topic, no baseline
+    ])
+    def test_single_topic(self, base, cur, expected):
+        topic_id = uuid4()
+        baseline = Baseline(period_days=30, topic_frequencies={topic_id: base})
+        current = CurrentMetrics(period_days=7, topic_frequencies={topic_id: cur})
+        
+        anomalies = AnomalyDetector()._check_topics(baseline, current)
+        
+        assert [a.anomaly_type.value for a in anomalies] == ([expected] if expected else [])
+    
+    def test_many_topics_in_one_call(self):
+        detector = AnomalyDetector()
+        rng = np.random.default_rng(42)
+        base = rng.uniform(0, 50, 200).round(1)
+        base[::10] = 0.0
+        cur = rng.uniform(0, 30, 200).round(1)
+        topic_ids = [uuid4() for _ in range(200)]
+        
+        baseline = Baseline(period_days=30, topic_frequencies=dict(zip(topic_ids, base.tolist())))
+        current = CurrentMetrics(period_days=7, topic_frequencies=dict(zip(topic_ids, cur.tolist())))
+        
+        anomalies = detector._check_topics(baseline, current)
+        
+        # Scalar reference of the same rule
+        expected = []
+        for topic_id, b, c in zip(topic_ids, base.tolist(), cur.tolist()):
+            if b > 0:
+                change = (c - b * 7 / 30) / (b * 7 / 30)
+                if change > detector.thresholds["topic_spike"]:
+                    expected.append((topic_id, "topic_spike"))
+                elif change < -detector.thresholds["topic_drop"]:
+                    expected.append((topic_id, "topic_disappearance"))
+        
+        assert [(a.topic_id, a.anomaly_type.value) for a in anomalies] == expected
+        assert {t for _, t in expected} == {"topic_spike", "topic_disappearance"}
 
 
 class TestCheckDecisions:
     """Tests for decision rate anomaly detection."""
     
     def test_detects_decision_surge(self):
-        from analytics.anomalies import AnomalyDetector, Baseline, CurrentMetrics
-        
         detector = AnomalyDetector()
         
         baseline = Baseline(
@@ -99,8 +145,6 @@ class TestCheckDecisions:
         assert len(surge) >= 1
     
     def test_detects_decision_drought(self):
-        from analytics.anomalies import AnomalyDetector, Baseline, CurrentMetrics
-        
         detector = AnomalyDetector()
         
         baseline = Baseline(
@@ -123,8 +167,6 @@ class TestCheckConfidence:
     """Tests for confidence anomaly detection."""
     
     def test_detects_confidence_spike(self):
-        from analytics.anomalies import AnomalyDetector, Baseline, CurrentMetrics
-        
         detector = AnomalyDetector()
         
         baseline = Baseline(
@@ -143,8 +185,6 @@ class TestCheckConfidence:
         assert len(spike) == 1
     
     def test_detects_confidence_drop(self):
-        from analytics.anomalies import AnomalyDetector, Baseline, CurrentMetrics
-        
         detector = AnomalyDetector()
         
         baseline = Baseline(
@@ -167,8 +207,6 @@ class TestCheckTopicDiversity:
     """Tests for topic diversity anomaly detection."""
     
     def test_detects_topic_narrowing(self):
-        from analytics.anomalies import AnomalyDetector, CurrentMetrics
-        
         detector = AnomalyDetector()
         
         current = CurrentMetrics(
@@ -182,8 +220,6 @@ class TestCheckTopicDiversity:
         assert len(narrowing) == 1
     
     def test_no_anomaly_with_diverse_topics(self):
-        from analytics.anomalies import AnomalyDetector, CurrentMetrics
-        
         detector = AnomalyDetector()
         
         current = CurrentMetrics(
@@ -207,11 +243,7 @@ class TestAnomalyService:
         db.commit = AsyncMock()
         return db
     
-    @pytest.mark.asyncio
     async def test_acknowledge_anomaly(self, mock_db):
-        from analytics.anomalies import AnomalyService
-        from analytics.cal_models import CALAnomaly
-        
         mock_anomaly = CALAnomaly(
             id=uuid4(),
             anomaly_type="topic_spike",
@@ -219,9 +251,9 @@ class TestAnomalyService:
             status="new",
         )
         
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_anomaly
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = SimpleNamespace(
+            scalar_one_or_none=lambda: mock_anomaly,
+        )
         
         service = AnomalyService()
         result = await service.acknowledge(mock_db, mock_anomaly.id)
@@ -229,14 +261,11 @@ class TestAnomalyService:
         assert result == True
         assert mock_anomaly.status == "acknowledged"
     
-    @pytest.mark.asyncio
     async def test_get_stats(self, mock_db):
-        from analytics.anomalies import AnomalyService
-        
-        mock_result = MagicMock()
-        mock_result.fetchall.return_value = []
-        mock_result.scalar.return_value = 0
-        mock_db.execute.return_value = mock_result
+        mock_db.execute.return_value = SimpleNamespace(
+            fetchall=lambda: [],
+            scalar=lambda: 0,
+        )
         
         service = AnomalyService()
         stats = await service.get_stats(mock_db)
@@ -249,8 +278,6 @@ class TestDataClasses:
     """Tests for data classes."""
     
     def test_baseline_creation(self):
-        from analytics.anomalies import Baseline
-        
         baseline = Baseline(
             period_days=30,
             decision_count=10,
@@ -261,8 +288,6 @@ class TestDataClasses:
         assert baseline.topic_frequencies == {}  # Default
     
     def test_current_metrics_creation(self):
-        from analytics.anomalies import CurrentMetrics
-        
         current = CurrentMetrics(
             period_days=7,
             active_topics=5,
@@ -271,8 +296,6 @@ class TestDataClasses:
         assert current.period_days == 7
     
     def test_anomaly_creation(self):
-        from analytics.anomalies import Anomaly, AnomalyType, Severity
-        
         anomaly = Anomaly(
             anomaly_type=AnomalyType.TOPIC_SPIKE,
             severity=Severity.MEDIUM,
@@ -296,10 +319,7 @@ class TestInterpret:
             )
             yield mock
     
-    @pytest.mark.asyncio
     async def test_interpret_anomaly(self, mock_groq):
-        from analytics.anomalies import AnomalyDetector, Anomaly, AnomalyType, Severity
-        
         detector = AnomalyDetector()
         
         anomaly = Anomaly(
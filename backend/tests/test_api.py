@@ -10,9 +10,6 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 from datetime import datetime
 
-import sys
-sys.path.insert(0, '.')
-
 
 class TestMessagesAPI:
     """Tests for Messages API."""
@@ -52,7 +49,6 @@ class TestMemoryAPI:
 class TestHealthAPI:
     """Tests for Health API."""
     
-    @pytest.mark.asyncio
     async def test_ping(self):
         from api.routes.health import ping
         
@@ -61,7 +57,6 @@ class TestHealthAPI:
         assert result["status"] == "pong"
         assert "timestamp" in result
     
-    @pytest.mark.asyncio
     async def test_liveness(self):
         from api.routes.health import liveness_check
         
@@ -41,7 +41,6 @@ class TestGraphBuilder:
 class TestCreateNodeFromMemory:
     """Tests for create_node_from_memory method."""
     
-    @pytest.mark.asyncio
     async def test_create_node_from_decision(self):
         from analytics.graphs import GraphBuilder
         from memory.models import MemoryItem
@@ -66,7 +65,6 @@ class TestCreateNodeFromMemory:
         assert node.importance_score > 0.5  # Decisions have higher importance
         db.add.assert_called_once()
     
-    @pytest.mark.asyncio
     async def test_create_node_from_insight(self):
         from analytics.graphs import GraphBuilder
         from memory.models import MemoryItem
@@ -95,7 +93,6 @@ class TestDetermineEdgeType:
         with patch('analytics.graphs.groq') as mock:
             yield mock
     
-    @pytest.mark.asyncio
     async def test_determine_edge_type_depends_on(self, mock_groq):
         mock_groq.complete_simple = AsyncMock(return_value="depends_on")
         
@@ -111,7 +108,6 @@ class TestDetermineEdgeType:
         
         assert edge_type == "depends_on"
     
-    @pytest.mark.asyncio
     async def test_determine_edge_type_none(self, mock_groq):
         mock_groq.complete_simple = AsyncMock(return_value="none")
         
@@ -136,7 +132,6 @@ class TestCheckContradiction:
         with patch('analytics.graphs.groq') as mock:
             yield mock
     
-    @pytest.mark.asyncio
     async def test_contradiction_detected(self, mock_groq):
         mock_groq.complete_simple = AsyncMock(return_value="YES 0.85")
         
@@ -153,7 +148,6 @@ class TestCheckContradiction:
         assert is_contra == True
         assert score == 0.85
     
-    @pytest.mark.asyncio
     async def test_no_contradiction(self, mock_groq):
         mock_groq.complete_simple = AsyncMock(return_value="NO 0.9")
         
@@ -181,7 +175,6 @@ class TestMindMapService:
         db.commit = AsyncMock()
         return db
     
-    @pytest.mark.asyncio
     async def test_get_graph_returns_data(self, mock_db):
         from analytics.graphs import MindMapService
         
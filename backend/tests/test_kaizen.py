@@ -183,6 +183,43 @@ class TestAdaptiveBehavior:
         
         # Overload state should select FIXER
         assert mode == AIBehaviorMode.FIXER
+
+    def test_select_explorer_for_sustained_growth(self):
+        from orchestrator.adaptive_behavior import AdaptiveAIBehavior, AIBehaviorMode
+        from analytics.kaizen_models import UserState
+
+        behavior = AdaptiveAIBehavior()
+        contours = {f"c{i}": {"trend": "up"} for i in range(10)}
+
+        assert behavior.select_behavior_mode(UserState.GROWTH, contours) == AIBehaviorMode.EXPLORER
+        assert behavior.select_behavior_mode(UserState.GROWTH, up_trend_count=3) == AIBehaviorMode.EXPLORER
+        assert behavior.select_behavior_mode(UserState.GROWTH, contours, up_trend_count=1) == AIBehaviorMode.STRATEGIST
+
+    def test_adapt_system_prompt_reuses_result_for_same_inputs(self):
+        from orchestrator.adaptive_behavior import AdaptiveAIBehavior, AIBehaviorMode
+        from analytics.kaizen_models import UserState
+        
+        behavior = AdaptiveAIBehavior()
+        first = behavior.adapt_system_prompt("base", UserState.OVERLOAD)
+        
+        with patch.object(behavior, "select_behavior_mode") as select:
+            assert behavior.adapt_system_prompt("base", UserState.OVERLOAD) is first
+            select.assert_not_called()
+        
+        assert behavior.adapt_system_prompt("base", UserState.GROWTH) != first
+        assert behavior.current_mode == AIBehaviorMode.STRATEGIST
+    
+    def test_adapt_system_prompt_uses_up_trend_count(self):
+        from orchestrator.adaptive_behavior import AdaptiveAIBehavior, AIBehaviorMode
+        from analytics.kaizen_models import UserState
+        
+        behavior = AdaptiveAIBehavior()
+        # Default contours come back as a list — must not be scanned
+        behavior.adapt_system_prompt("base", UserState.PLATEAU, [{"trend": "up"}])
+        assert behavior.current_mode == AIBehaviorMode.ANALYST
+        
+        behavior.adapt_system_prompt("base", UserState.GROWTH, None, up_trend_count=4)
+        assert behavior.current_mode == AIBehaviorMode.EXPLORER
     
     def test_get_behavior_config(self):
         from orchestrator.adaptive_behavior import AdaptiveAIBehavior, AIBehaviorMode
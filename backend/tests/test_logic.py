@@ -40,7 +40,6 @@ class TestExtractStructure:
         with patch('analytics.logic.groq') as mock:
             yield mock
     
-    @pytest.mark.asyncio
     async def test_extract_structure_parses_json(self, mock_groq):
         mock_groq.complete_simple = AsyncMock(return_value='''
         {
@@ -82,7 +81,6 @@ class TestValidateLogic:
             mock.complete_simple = AsyncMock(return_value='[]')
             yield mock
     
-    @pytest.mark.asyncio
     async def test_validate_detects_missing_counterarguments(self, mock_groq):
         from analytics.logic import LogicAnalyzer, DecisionStructure
         
@@ -100,7 +98,6 @@ class TestValidateLogic:
         issue_types = [i.issue_type for i in issues]
         assert "ignored_counterargument" in issue_types
     
-    @pytest.mark.asyncio
     async def test_validate_detects_unverified_assumptions(self, mock_groq):
         from analytics.logic import LogicAnalyzer, DecisionStructure, Assumption
         
@@ -121,7 +118,6 @@ class TestValidateLogic:
 class TestAssessRisks:
     """Tests for _assess_risks method."""
     
-    @pytest.mark.asyncio
     async def test_assess_risks_from_assumptions(self):
         from analytics.logic import LogicAnalyzer, DecisionStructure, Assumption
         
@@ -279,7 +275,6 @@ class TestDataClasses:
 class TestDecisionAnalysisService:
     """Tests for DecisionAnalysisService."""
     
-    @pytest.mark.asyncio
     async def test_get_stats(self):
         from analytics.logic import DecisionAnalysisService
         
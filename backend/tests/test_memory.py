@@ -19,6 +19,7 @@ class TestShortTermMemory:
         """Create a mock Redis client."""
         mock = MagicMock()
         mock.get = AsyncMock(return_value=None)
+        mock.hgetall = AsyncMock(return_value={})
         mock.set = AsyncMock()
         mock.setex = AsyncMock()
         mock.lpush = AsyncMock()
@@ -26,9 +27,12 @@ class TestShortTermMemory:
         mock.lrange = AsyncMock(return_value=[])
         mock.expire = AsyncMock()
         mock.ltrim = AsyncMock()
+        
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[])
+        mock.pipeline.return_value.__aenter__.return_value = pipe
         return mock
     
-    @pytest.mark.asyncio
     async def test_get_session_not_found(self, mock_redis):
         from memory.short_term import ShortTermMemory
         
@@ -39,7 +43,44 @@ class TestShortTermMemory:
         
         assert session is None
     
-    @pytest.mark.asyncio
+    async def test_update_session_writes_fields_only(self, mock_redis):
+        from memory.short_term import ShortTermMemory
+        
+        stm = ShortTermMemory()
+        stm.redis = mock_redis  # Inject mock redis
+        
+        await stm.update_session("test-session", {"active_topics": ["rag"]})
+        
+        pipe = mock_redis.pipeline.return_value.__aenter__.return_value
+        pipe.hset.assert_called_once_with(
+            "session:v2:test-session",
+            mapping={"active_topics": '["rag"]'},
+        )
+        # Defaults are seeded only where the field is missing
+        seeded = {call.args[1] for call in pipe.hsetnx.call_args_list}
+        assert seeded == {"started_at", "last_activity", "active_topics", "current_mode"}
+        pipe.execute.assert_awaited_once()
+        mock_redis.hgetall.assert_not_called()
+    
+    async def test_get_session_and_history_single_round_trip(self, mock_redis):
+        from memory.short_term import ShortTermMemory
+        
+        stm = ShortTermMemory()
+        stm.redis = mock_redis  # Inject mock redis
+        
+        pipe = mock_redis.pipeline.return_value.__aenter__.return_value
+        pipe.execute = AsyncMock(return_value=[
+            {"current_mode": '"default"'},
+            ['{"role": "user", "content": "Hello"}'],
+        ])
+        
+        session, history = await stm.get_session_and_history("test-session", limit=5)
+        
+        assert session == {"current_mode": "default"}
+        assert history == [{"role": "user", "content": "Hello"}]
+        pipe.lrange.assert_called_once_with("chat:test-session", -5, -1)
+        pipe.execute.assert_awaited_once()
+    
     async def test_add_message(self, mock_redis):
         from memory.short_term import ShortTermMemory
         
@@ -53,6 +94,27 @@ class TestShortTermMemory:
         )
         
         mock_redis.rpush.assert_called()
+    
+    async def test_add_messages_single_round_trip(self, mock_redis):
+        from memory.short_term import ShortTermMemory
+        
+        stm = ShortTermMemory()
+        stm.redis = mock_redis  # Inject mock redis
+        
+        await stm.add_messages("test-session", [
+            ("user", "Hello", None),
+            ("assistant", "Hi", "core"),
+        ])
+        
+        pipe = mock_redis.pipeline.return_value.__aenter__.return_value
+        pipe.rpush.assert_called_once_with(
+            "chat:test-session",
+            '{"role": "user", "content": "Hello", "agent": null}',
+            '{"role": "assistant", "content": "Hi", "agent": "core"}',
+        )
+        pipe.ltrim.assert_called_once_with("chat:test-session", -200, -1)
+        pipe.execute.assert_awaited_once()
+        mock_redis.rpush.assert_not_called()
 
 
 class TestLongTermMemory:
@@ -67,7 +129,6 @@ class TestLongTermMemory:
         db.refresh = AsyncMock()
         return db
     
-    @pytest.mark.asyncio
     async def test_save_memory_item(self, mock_db):
         from memory.long_term import LongTermMemory
         from memory.models import MemoryItem
@@ -89,7 +150,6 @@ class TestLongTermMemory:
             mock_db.add.assert_called_once()
             mock_db.commit.assert_called_once()
     
-    @pytest.mark.asyncio
     async def test_search_by_text(self, mock_db):
         from memory.long_term import LongTermMemory
         
@@ -132,7 +192,6 @@ class TestSemanticMemory:
         db.rollback = AsyncMock()
         return db
     
-    @pytest.mark.asyncio
     async def test_get_embedding(self, mock_embedding_service):
         from memory.semantic import SemanticMemoryService
         
@@ -142,7 +201,6 @@ class TestSemanticMemory:
         assert len(embedding) == 1536
         mock_embedding_service.generate_embedding.assert_called_once_with("Test text")
     
-    @pytest.mark.asyncio
     async def test_get_embedding_fallback(self):
         """Test fallback pseudo-embedding when API fails."""
         with patch('memory.semantic.embedding_service') as mock:
@@ -157,7 +215,6 @@ class TestSemanticMemory:
             with pytest.raises(Exception):
                 await service.get_embedding("Test")
     
-    @pytest.mark.asyncio
     async def test_index_memory(self, mock_embedding_service, mock_db):
         from memory.semantic import SemanticMemoryService
         
@@ -175,6 +232,43 @@ class TestSemanticMemory:
         assert success == True
         mock_embedding_service.index_items.assert_called_once()
     
+    async def test_reindex_all_batches_ids(self, mock_embedding_service, mock_db):
+        from memory.semantic import SemanticMemoryService
+        
+        ids = [uuid4() for _ in range(5)]
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = ids
+        mock_db.execute.return_value = mock_result
+        
+        service = SemanticMemoryService()
+        total = await service.reindex_all(mock_db, batch_size=2)
+        
+        assert total == 3
+        batches = [c.args[1] for c in mock_embedding_service.index_items.call_args_list]
+        assert batches == [ids[0:2], ids[2:4], ids[4:5]]
+    
+    async def test_index_items_single_upsert(self, mock_db):
+        from memory.embeddings import EmbeddingService
+        
+        items = [MagicMock(id=uuid4(), content=None, summary=None) for _ in range(3)]
+        fetched = MagicMock()
+        fetched.scalars.return_value.all.return_value = items
+        mock_db.execute.return_value = fetched
+        mock_db.flush = AsyncMock()
+        
+        service = EmbeddingService()
+        with patch.object(
+            service, "generate_embeddings_batch",
+            AsyncMock(return_value=[[0.1] * 1536] * 3),
+        ) as batch:
+            indexed = await service.index_items(mock_db, [item.id for item in items])
+        
+        assert indexed == 3
+        batch.assert_awaited_once()
+        # One SELECT for the items, one multi-row upsert
+        assert mock_db.execute.await_count == 2
+        mock_db.add.assert_not_called()
+    
     def test_embedding_dimension(self):
         from memory.models import EMBEDDING_DIMENSION
         
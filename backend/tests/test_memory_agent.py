@@ -65,7 +65,6 @@ class TestExtractCandidates:
         with patch('agents.memory_agent.groq') as mock:
             yield mock
     
-    @pytest.mark.asyncio
     async def test_extract_candidates_decision(self, mock_groq):
         mock_groq.complete_simple = AsyncMock(
             return_value='[{"type": "decision", "content": "Будем делать X", "confidence": 0.9}]'
@@ -80,7 +79,6 @@ class TestExtractCandidates:
         assert candidates[0].type == "decision"
         assert candidates[0].confidence == 0.9
     
-    @pytest.mark.asyncio
     async def test_extract_candidates_fallback(self, mock_groq):
         """Test fallback rule-based extraction when LLM fails."""
         mock_groq.complete_simple = AsyncMock(side_effect=Exception("API Error"))
@@ -138,7 +136,6 @@ class TestAutoSave:
                 "ltm": mock_ltm,
             }
     
-    @pytest.mark.asyncio
     async def test_auto_save_saves_high_confidence(self, mock_all_deps):
         from agents.memory_agent import MemoryAgentV2
         from agents.base import AgentContext, AgentResponse
@@ -182,7 +179,6 @@ class TestForgetFunctionality:
             mock.find_similar = AsyncMock(return_value=[])
             yield mock
     
-    @pytest.mark.asyncio
     async def test_prepare_forget(self, mock_semantic):
         from agents.memory_agent import MemoryAgentV2
         
@@ -196,7 +192,6 @@ class TestForgetFunctionality:
         assert request.memory_id is not None
         assert "Найдено" in message
     
-    @pytest.mark.asyncio
     async def test_execute_forget_requires_confirmation(self):
         from agents.memory_agent import MemoryAgentV2, ForgetRequest
         
@@ -226,7 +221,6 @@ class TestAggregate:
             
             yield {"groq": mock_groq, "semantic": mock_semantic}
     
-    @pytest.mark.asyncio
     async def test_aggregate_needs_min_items(self, mock_deps):
         from agents.memory_agent import MemoryAgentV2
         
@@ -43,6 +43,7 @@ class TestRequestRouter:
         with patch('orchestrator.router.short_term_memory') as mock:
             mock.get_chat_history = AsyncMock(return_value=[])
             mock.add_message = AsyncMock()
+            mock.add_messages = AsyncMock()
             yield mock
     
     @pytest.fixture
@@ -62,7 +63,6 @@ class TestRequestRouter:
             mock.return_value = profile
             yield mock
     
-    @pytest.mark.asyncio
     async def test_route_with_intent_analysis(
         self, 
         mock_intent_analyzer, 
@@ -87,7 +87,6 @@ class TestRequestRouter:
             assert response.content == "Test response"
             mock_intent_analyzer.analyze.assert_called_once()
     
-    @pytest.mark.asyncio
     async def test_route_creates_session(
         self, 
         mock_intent_analyzer,
@@ -110,9 +109,62 @@ class TestRequestRouter:
             response = await router.route("Hello", session_id=None)
             
             assert response.content == "Test response"
-            mock_short_term.add_message.assert_called()
+            mock_short_term.add_messages.assert_called()
+    
+    async def test_agent_failure_is_logged(
+        self, 
+        mock_intent_analyzer,
+        mock_short_term, 
+        mock_memory_agent,
+        mock_profile
+    ):
+        """A failing agent leaves a request_failed record and re-raises."""
+        from orchestrator.router import RequestRouter
+        
+        with patch('orchestrator.router.core_agent') as mock_agent, \
+                patch('orchestrator.router.logger') as mock_logger:
+            mock_agent.run = AsyncMock(side_effect=RuntimeError("LLM down"))
+            mock_agent.name = "core"
+            
+            router = RequestRouter()
+            with pytest.raises(RuntimeError):
+                await router.route("What is our 5-year vision?", session_id=None)
+            
+            mock_logger.error.assert_called_once()
+            args, kwargs = mock_logger.error.call_args
+            assert args == ("request_failed",)
+            assert kwargs["error"] == "LLM down"
+            mock_short_term.add_messages.assert_not_called()
+    
+    async def test_trivial_message_skips_classifiers(
+        self, 
+        mock_intent_analyzer,
+        mock_short_term, 
+        mock_memory_agent,
+        mock_profile
+    ):
+        """Acknowledgements like "спасибо!" are routed without classification."""
+        from orchestrator.router import RequestRouter
+        from agents.base import AgentResponse
+        
+        with patch('orchestrator.router.core_agent') as mock_agent, \
+                patch('orchestrator.router.model_router') as mock_model_router:
+            mock_agent.run = AsyncMock(return_value=AgentResponse(
+                content="Пожалуйста",
+                agent="core",
+            ))
+            mock_agent.name = "core"
+            mock_model_router.classify = AsyncMock()
+            
+            router = RequestRouter()
+            await router.route("Спасибо!", session_id=None)
+            
+            mock_intent_analyzer.analyze.assert_not_called()
+            mock_model_router.classify.assert_not_called()
+            context = mock_agent.run.await_args.args[0]
+            assert context.request_type == "social"
+            assert context.model_role == "fast"
     
-    @pytest.mark.asyncio
     async def test_route_saves_to_memory(
         self, 
         mock_intent_analyzer,
@@ -138,6 +190,17 @@ class TestRequestRouter:
             response = await router.route("Remember this", session_id=None, db=mock_db)
             
             mock_memory_agent.save_from_response.assert_called()
+    
+    def test_base_prompt_cached_until_profile_invalidated(self, mock_profile):
+        from orchestrator.router import RequestRouter
+        
+        router = RequestRouter()
+        mock_profile.return_value.get_system_prompt.return_value = "Updated profile"
+        assert router._base_prompt != "Updated profile"
+        
+        router.invalidate_profile()
+        
+        assert router._base_prompt == "Updated profile"
 
 
 class TestContextManager:
@@ -146,10 +209,15 @@ class TestContextManager:
     @pytest.fixture
     def mock_short_term(self):
         """Mock short-term memory."""
+        from memory.short_term import ShortTermMemory
+        
         with patch('orchestrator.context.short_term_memory') as mock:
+            mock.new_session = ShortTermMemory.new_session
             mock.get_session = AsyncMock(return_value=None)
-            mock.save_session = AsyncMock()
+            mock.set_session = AsyncMock()
+            mock.update_session = AsyncMock()
             mock.get_chat_history = AsyncMock(return_value=[])
+            mock.get_session_and_history = AsyncMock(return_value=(None, []))
             yield mock
     
     @pytest.fixture
@@ -168,7 +236,6 @@ class TestContextManager:
             mock.return_value = profile
             yield mock
     
-    @pytest.mark.asyncio
     async def test_get_session_creates_new(self, mock_short_term, mock_profile):
         """Test session creation when none exists."""
         from orchestrator.context import ContextManager
@@ -179,9 +246,8 @@ class TestContextManager:
         assert "started_at" in session
         assert "last_activity" in session
         assert session["active_topics"] == []
-        mock_short_term.save_session.assert_called_once()
+        mock_short_term.set_session.assert_called_once()
     
-    @pytest.mark.asyncio
     async def test_get_session_returns_existing(self, mock_short_term, mock_profile):
         """Test returning existing session."""
         existing_session = {
@@ -196,9 +262,8 @@ class TestContextManager:
         session = await cm.get_session("test-session-id")
         
         assert session["active_topics"] == ["business"]
-        mock_short_term.save_session.assert_not_called()
+        mock_short_term.set_session.assert_not_called()
     
-    @pytest.mark.asyncio
     async def test_assemble_context(
         self, 
         mock_short_term, 
@@ -221,7 +286,61 @@ class TestContextManager:
         assert context.message_type == "strategic"
         assert context.system_prompt == "System prompt"
     
-    @pytest.mark.asyncio
+    async def test_assemble_reuses_session_topic_ids(
+        self,
+        mock_short_term,
+        mock_long_term,
+        mock_profile
+    ):
+        """Test that topic IDs stored in the session are reused."""
+        topic_id = uuid4()
+        mock_short_term.get_session_and_history = AsyncMock(return_value=(
+            {"active_topics": [{"id": str(topic_id), "name": "business"}]},
+            [],
+        ))
+        
+        from orchestrator.context import ContextManager
+        
+        cm = ContextManager()
+        context = await cm.assemble(
+            message="Test message",
+            message_type="strategic",
+            session_id=uuid4(),
+            include_memories=False,
+        )
+        
+        assert [(t.id, t.name) for t in context.active_topics] == [(topic_id, "business")]
+        
+        again = await cm.assemble(
+            message="Test message",
+            message_type="strategic",
+            session_id=context.session_id,
+            include_memories=False,
+        )
+        assert again.active_topics[0] is context.active_topics[0]
+        
+        # Cached topics are shared between contexts, so they must be immutable
+        from dataclasses import FrozenInstanceError
+        with pytest.raises(FrozenInstanceError):
+            again.active_topics[0].confidence = 0.9
+    
+    async def test_update_session_topics_keeps_known_ids(self, mock_short_term, mock_profile):
+        """Topics that stay active keep their IDs; new names get fresh ones."""
+        topic_id = str(uuid4())
+        mock_short_term.get_session = AsyncMock(return_value={
+            "active_topics": [{"id": topic_id, "name": "business"}, "legacy"],
+        })
+        
+        from orchestrator.context import ContextManager
+        
+        cm = ContextManager()
+        await cm.update_session_topics("test-session", ["business", "health"])
+        
+        _, updates = mock_short_term.update_session.call_args.args
+        business, health = updates["active_topics"]
+        assert business == {"id": topic_id, "name": "business"}
+        assert health["name"] == "health" and health["id"] != topic_id
+    
     async def test_get_conversation_history(self, mock_short_term, mock_profile):
         """Test conversation history retrieval."""
         mock_short_term.get_chat_history = AsyncMock(return_value=[
@@ -237,6 +356,387 @@ class TestContextManager:
         assert len(history) == 2
         assert history[0].role == "user"
         assert history[1].role == "assistant"
+        assert history[0].timestamp == "2024-01-01T00:00:00"
+        assert history[1].dt() == datetime(2024, 1, 1, 0, 0, 1)
+
+
+class TestIntentClassifier:
+    """Tests for keyword-based IntentClassifier."""
+    
+    def test_classify_by_keywords(self):
+        from orchestrator.intent_classifier import IntentClassifier
+        
+        classifier = IntentClassifier()
+        
+        assert classifier.classify("Напомни мне завтра в 10:00") == "schedule"
+        assert classifier.classify("Что делать, стоит ли соглашаться?") == "decision_request"
+        assert classifier.classify("Проверь, это правда?") == "fact_check"
+    
+    def test_keyword_matcher_paths_agree(self, monkeypatch):
+        import orchestrator.intent_classifier as ic
+        
+        groups = {"a": ["напомни", "напомни мне", "встреч"], "b": ["встреч", "план"]}
+        text = "напомни мне про встречу и план"
+        expected = {"a": 3, "b": 2}
+        
+        assert ic.KeywordMatcher(groups).scores(text) == expected
+        monkeypatch.setattr(ic, "ahocorasick", None)
+        assert ic.KeywordMatcher(groups).scores(text) == expected
+    
+    def test_keyword_ties_follow_declaration_order(self, monkeypatch):
+        import orchestrator.intent_classifier as ic
+        
+        cases = {
+            "план встреча": "schedule",
+            "думаю про план": "planning",
+            "проверь встреча": "schedule",
+            "мой прогресс и план": "planning",
+        }
+        classifier = ic.IntentClassifier()
+        for aho in (ic.ahocorasick, None):
+            monkeypatch.setattr(ic, "ahocorasick", aho)
+            monkeypatch.setattr(ic.KEYWORD_INDEX, "_matcher", None)
+            monkeypatch.setattr(ic.KEYWORD_INDEX, "_last", (None, {}))
+            assert {text: classifier.classify(text) for text in cases} == cases
+    
+    def test_keyword_index_scans_once_for_all_namespaces(self):
+        from orchestrator.intent_classifier import KeywordIndex, KeywordMatcher
+        
+        index = KeywordIndex()
+        index.register("classifier", {"schedule": ["напомни"], "planning": ["план"]})
+        index.register("analyzer", {"schedule": ["напомни", "встреч"]})
+        
+        text = "напомни про встречу"
+        with patch.object(KeywordMatcher, "scores", autospec=True, side_effect=KeywordMatcher.scores) as scan:
+            scores = index.scores(text)
+            assert index.scores(text) is scores
+            scan.assert_called_once()
+        
+        assert scores == {"classifier": {"schedule": 1}, "analyzer": {"schedule": 2}}
+    
+    def test_keyword_index_keeps_registration_order(self, monkeypatch):
+        import orchestrator.intent_classifier as ic
+        
+        text = "план и встреча"  # "план" встречается в тексте раньше
+        for aho in (ic.ahocorasick, None):
+            monkeypatch.setattr(ic, "ahocorasick", aho)
+            index = ic.KeywordIndex()
+            index.register("classifier", {"schedule": ["встреч"], "planning": ["план"]})
+            index.register("analyzer", {"strategic": ["план"], "schedule": ["встреч"]})
+            
+            scores = index.scores(text)
+            assert list(scores["classifier"]) == ["schedule", "planning"]
+            assert list(scores["analyzer"]) == ["strategic", "schedule"]
+    
+    def test_keyword_intents_are_registered(self):
+        from orchestrator.intent_classifier import INTENTS, IntentClassifier
+        
+        assert set(IntentClassifier.KEYWORDS) <= set(INTENTS)
+        assert "casual" in INTENTS
+    
+    def test_classify_fallback_casual(self):
+        from orchestrator.intent_classifier import IntentClassifier
+        
+        assert IntentClassifier().classify("Привет") == "casual"
+
+
+class TestIntentAnalyzer:
+    """Tests for LLM-backed IntentAnalyzer."""
+    
+    async def test_repeated_message_served_from_cache(self):
+        from orchestrator.intent_analyzer import IntentAnalyzer, RequestCategory
+        
+        reply = '{"category": "strategic", "confidence": 0.9}'
+        with patch('orchestrator.intent_analyzer.openrouter') as mock_llm:
+            mock_llm.complete_simple = AsyncMock(return_value=reply)
+            
+            analyzer = IntentAnalyzer()
+            first = await analyzer.analyze("Какая у нас стратегия на 5 лет?")
+            second = await analyzer.analyze("какая у нас  стратегия на 5 лет?")
+            
+            assert first.category == second.category == RequestCategory.STRATEGIC
+            assert mock_llm.complete_simple.await_count == 1
+    
+    async def test_clear_schedule_request_skips_llm(self):
+        from orchestrator.intent_analyzer import IntentAnalyzer, RequestCategory, ActionType
+        
+        reply = '{"category": "meta", "confidence": 0.8}'
+        with patch('orchestrator.intent_analyzer.openrouter') as mock_llm:
+            mock_llm.complete_simple = AsyncMock(return_value=reply)
+            analyzer = IntentAnalyzer()
+            
+            strong = await analyzer.analyze("Напомни срочно выпить таблетки")
+            assert strong.category == RequestCategory.SCHEDULE
+            assert strong.action_type == ActionType.REMIND
+            assert strong.urgency == 0.9
+            mock_llm.complete_simple.assert_not_awaited()
+            
+            # A lone keyword in a question still goes to the LLM
+            await analyzer.analyze("Как работает расписание в 2 этапа?")
+            mock_llm.complete_simple.assert_awaited_once()
+    
+    async def test_schedule_question_goes_to_llm(self):
+        from orchestrator.intent_analyzer import IntentAnalyzer, RequestCategory
+        
+        reply = '{"category": "meta", "confidence": 0.8}'
+        with patch('orchestrator.intent_analyzer.openrouter') as mock_llm:
+            mock_llm.complete_simple = AsyncMock(return_value=reply)
+            analyzer = IntentAnalyzer()
+            
+            # Several schedule keywords, but a question about the assistant itself
+            result = await analyzer.analyze("Почему ты удалил задача из расписание?")
+            
+            mock_llm.complete_simple.assert_awaited_once()
+            assert result.category == RequestCategory.META
+    
+    async def test_voice_prefix_stripped(self):
+        from orchestrator.intent_analyzer import IntentAnalyzer
+        
+        with patch('orchestrator.intent_analyzer.openrouter') as mock_llm:
+            mock_llm.complete_simple = AsyncMock(return_value='{"category": "social"}')
+            await IntentAnalyzer().analyze("🎤 Распознано: Привет")
+        
+        call = mock_llm.complete_simple.await_args
+        assert 'Сообщение: "Привет"' in call.args[0]
+        assert call.kwargs["response_format"]["type"] == "json_schema"
+    
+    async def test_confident_local_model_skips_llm(self):
+        from orchestrator.intent_analyzer import IntentAnalyzer, RequestCategory
+        
+        with patch('orchestrator.intent_analyzer.openrouter') as mock_llm:
+            mock_llm.complete_simple = AsyncMock(return_value='{"category": "meta"}')
+            analyzer = IntentAnalyzer()
+            analyzer._local_model = MagicMock()
+            
+            analyzer._local_model.predict.return_value = (RequestCategory.CREATIVE, 0.92)
+            result = await analyzer.analyze("Придумай название для проекта")
+            assert result.category == RequestCategory.CREATIVE
+            mock_llm.complete_simple.assert_not_awaited()
+            
+            analyzer._local_model.predict.return_value = (RequestCategory.CREATIVE, 0.4)
+            result = await analyzer.analyze("Придумай название для проекта")
+            assert result.category == RequestCategory.META
+    
+    async def test_unknown_enum_values_use_defaults(self):
+        from orchestrator.intent_analyzer import IntentAnalyzer, ActionType, EmotionalState, RequestCategory
+        
+        reply = '{"category": "creative", "emotional_state": "sleepy", "action_type": "dance", "confidence": 0.8}'
+        with patch('orchestrator.intent_analyzer.openrouter') as mock_llm:
+            mock_llm.complete_simple = AsyncMock(return_value=reply)
+            result = await IntentAnalyzer().analyze("Придумай стих")
+        
+        assert result.category == RequestCategory.CREATIVE
+        assert result.emotional_state == EmotionalState.NEUTRAL
+        assert result.action_type == ActionType.ANSWER
+        assert result.confidence == 0.8
+    
+    async def test_analyze_many_keeps_order(self):
+        from orchestrator.intent_analyzer import IntentAnalyzer, RequestCategory
+        
+        replies = {
+            "План на год": '{"category": "strategic"}',
+            "Покажи метрики": '{"category": "analytical"}',
+        }
+        
+        async def complete(prompt, system=None, model=None, response_format=None):
+            return next(r for m, r in replies.items() if m in prompt)
+        
+        with patch('orchestrator.intent_analyzer.openrouter') as mock_llm:
+            mock_llm.complete_simple = complete
+            
+            results = await IntentAnalyzer().analyze_many(list(replies), concurrency=1)
+        
+        assert [r.category for r in results] == [
+            RequestCategory.STRATEGIC,
+            RequestCategory.ANALYTICAL,
+        ]
+    
+    def test_fallback_analysis_heuristics(self):
+        from orchestrator.intent_analyzer import IntentAnalyzer, EmotionalState, RequestCategory
+        
+        analyzer = IntentAnalyzer()
+        urgent = analyzer._fallback_analysis("Нужно успеть срочно", "нужно успеть срочно")
+        assert (urgent.urgency, urgent.emotional_state) == (0.9, EmotionalState.STRESSED)
+        
+        thanks = analyzer._fallback_analysis("Спасибо, какие метрики?", "спасибо, какие метрики?")
+        assert thanks.category == RequestCategory.ANALYTICAL
+        assert thanks.emotional_state == EmotionalState.POSITIVE
+    
+    def test_semantic_cache_matches_close_vectors(self):
+        from llm.reply_cache import ReplyCache
+        
+        cache = ReplyCache(maxsize=8, semantic_size=2, threshold=0.95)
+        cache.put("a", "reply-a", cache.as_unit_vector([1.0, 0.0]))
+        
+        assert cache.get_similar(cache.as_unit_vector([0.99, 0.05])) == "reply-a"
+        assert cache.get_similar(cache.as_unit_vector([0.0, 1.0])) is None
+
+
+class TestDigitalProfile:
+    """Tests for DigitalProfile."""
+    
+    def test_system_prompt_built_once(self):
+        from orchestrator.profile import DigitalProfile
+        
+        profile = DigitalProfile({"profile": {"name": "Denis", "principles": ["Честность"]}})
+        
+        with patch.object(DigitalProfile, "_build_system_prompt", return_value="prompt") as build:
+            assert profile.get_system_prompt() == "prompt"
+            assert profile.get_system_prompt() == "prompt"
+            build.assert_called_once()
+        
+        assert "- Честность" in DigitalProfile({"profile": {"principles": ["Честность"]}}).get_system_prompt()
+    
+    def test_apply_terminology(self):
+        from orchestrator.profile import DigitalProfile
+        
+        profile = DigitalProfile({"profile": {"terminology": {
+            "задача": "задание",
+            "подзадача": "шаг",
+        }}})
+        
+        assert profile.apply_terminology("задача и подзадача") == "задание и шаг"
+        assert DigitalProfile({}).apply_terminology("текст") == "текст"
+    
+    def test_loader_uses_fresh_json_snapshot(self, tmp_path):
+        import os
+        from orchestrator.profile import ProfileLoader
+        
+        profile_path = tmp_path / "den.yaml"
+        profile_path.write_text("profile:\n  name: Денис\n", encoding="utf-8")
+        loader = ProfileLoader(str(profile_path), cache_dir=str(tmp_path / "cache"))
+        
+        assert loader.load().name == "Денис"
+        assert loader.snapshot_path(profile_path.read_bytes()).exists()
+        assert not list(tmp_path.glob("*.json"))  # nothing written next to the YAML
+        
+        with patch("orchestrator.profile.yaml.load") as yaml_load:
+            assert loader.load().name == "Денис"
+            yaml_load.assert_not_called()
+        
+        # Edited YAML with an unchanged mtime — still re-parsed
+        stat = profile_path.stat()
+        profile_path.write_text("profile:\n  name: Den\n", encoding="utf-8")
+        os.utime(profile_path, (stat.st_atime, stat.st_mtime))
+        assert loader.load().name == "Den"
+        assert len(list((tmp_path / "cache").glob("den-*.json"))) == 1
+
+
+class TestModelRouter:
+    """Tests for ModelRouter."""
+    
+    async def test_llm_classification_cached(self):
+        from llm.model_router import ModelRouter, TaskCategory
+        
+        with patch('llm.model_router.llm_selector') as selector:
+            selector.complete_simple = AsyncMock(return_value='{"category": "thinking", "confidence": 0.7}')
+            router = ModelRouter()
+            
+            first = await router.classify("В чём смысл всего этого")
+            second = await router.classify("в чём  смысл всего этого")
+        
+        assert first == second
+        assert first[0] == TaskCategory.THINKING
+        selector.complete_simple.assert_awaited_once()
+
+
+class TestRAG2Orchestrator:
+    """Tests for RAG2Orchestrator pipeline."""
+    
+    async def test_query_embedding_computed_alongside_state_upsert(self):
+        from orchestrator import rag2_orchestrator as module
+        
+        state = MagicMock(goal=None, open_questions=None, current_step=None)
+        state.to_dict.return_value = {}
+        with patch.object(module, "conversation_state_repo") as repo, \
+             patch.object(module, "state_extractor") as extractor, \
+             patch.object(module, "rag2_search_service") as search, \
+             patch.object(module, "context_assembler") as assembler, \
+             patch.object(module, "memory_event_tracker"):
+            repo.get_by_conversation_id = AsyncMock(return_value=None)
+            repo.upsert = AsyncMock(return_value=state)
+            extractor.extract_state = AsyncMock(return_value={"active_entities": ["Redis"]})
+            search.embed_query = AsyncMock(return_value=[0.1, 0.2])
+            search.hybrid_search = AsyncMock(return_value=[])
+            assembler.assemble_context = AsyncMock(return_value="ctx")
+            
+            result = await module.RAG2Orchestrator().process_message(
+                db=MagicMock(), user_id=uuid4(), chat_id="chat", message="Как там Redis?", recent_messages=[],
+            )
+        
+        search.embed_query.assert_awaited_once_with("Как там Redis?", ["Redis"])
+        assert search.hybrid_search.await_args.kwargs["query_embedding"] == [0.1, 0.2]
+        assert result["framed_context"] == "ctx"
+
+
+class TestMemoryEventTracker:
+    """Tests for memory usage logging."""
+    
+    async def test_log_and_increment_is_one_statement(self):
+        from sqlalchemy.dialects import postgresql
+        from memory.event_tracker import memory_event_tracker
+        
+        db = MagicMock()
+        db.execute = AsyncMock()
+        await memory_event_tracker.log_and_increment(db, uuid4(), [uuid4(), uuid4()], context="ctx")
+        
+        db.execute.assert_awaited_once()
+        sql = str(db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("WITH events AS")
+        assert "INSERT INTO memory_events" in sql
+        assert "UPDATE memory_items SET usage_count" in sql
+
+
+class TestUserSettings:
+    """Tests for user settings loading."""
+    
+    async def test_settings_served_from_redis_cache(self):
+        import json
+        from orchestrator import user_settings as module
+        
+        redis = MagicMock()
+        redis.get = AsyncMock(return_value=json.dumps({"ai_role": "coach_socratic", "active_rules": ["Без воды"]}))
+        redis.set = AsyncMock()
+        db = MagicMock()
+        db.execute = AsyncMock()
+        
+        with patch.object(module.short_term_memory, "redis", redis):
+            context = await module.get_user_settings(db, uuid4())
+        
+        assert context.ai_role == "coach_socratic"
+        assert context.active_rules == ["Без воды"]
+        db.execute.assert_not_awaited()
+    
+    def test_context_is_immutable_with_default_lists(self):
+        from dataclasses import FrozenInstanceError
+        from orchestrator.user_settings import UserSettingsContext
+        
+        first, second = UserSettingsContext(), UserSettingsContext()
+        
+        assert first.allowed_actions == ["create_decisions", "link_memories"]
+        assert first.active_rules == []
+        assert first.active_rules is not second.active_rules
+        with pytest.raises(FrozenInstanceError):
+            first.ai_role = "coach_socratic"
+    
+    async def test_cache_miss_loads_and_stores(self):
+        from orchestrator import user_settings as module
+        
+        redis = MagicMock()
+        redis.get = AsyncMock(return_value=None)
+        redis.set = AsyncMock()
+        settings_result = MagicMock()
+        settings_result.scalar_one_or_none.return_value = None
+        rules_result = MagicMock()
+        rules_result.scalars.return_value.all.return_value = []
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=[settings_result, rules_result])
+        
+        with patch.object(module.short_term_memory, "redis", redis):
+            context = await module.get_user_settings(db, uuid4())
+        
+        assert context.ai_role == "partner_strategic"
+        redis.set.assert_awaited_once()
 
 
 class TestAgentContext:
@@ -5,7 +5,6 @@ RAG 2.0 — State Extractor Contract Tests
 Тесты для State Extractor prompt behavior
 """
 
-import pytest
 import json
 from uuid import uuid4
 
@@ -16,7 +15,6 @@ from memory.state_extractor import state_extractor
 # 2️⃣ State Extractor Prompt — Contract Tests
 # ═══════════════════════════════════════════════════════════════════════════
 
-@pytest.mark.asyncio
 async def test_se_01_json_only_output():
     """
     SE-01: JSON-only output
@@ -47,7 +45,6 @@ async def test_se_01_json_only_output():
         assert isinstance(result["decisions_made"], list)
 
 
-@pytest.mark.asyncio
 async def test_se_02_partial_update():
     """
     SE-02: Partial update
@@ -95,7 +92,6 @@ async def test_se_02_partial_update():
     assert result.get("active_entities") is not None  # не должно быть полностью сброшено
 
 
-@pytest.mark.asyncio
 async def test_se_03_uncertainty_handling():
     """
     SE-03: Uncertainty handling
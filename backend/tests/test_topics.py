@@ -31,7 +31,6 @@ class TestTopicExtractor:
         db.execute = AsyncMock()
         return db
     
-    @pytest.mark.asyncio
     async def test_extract_topics(self, mock_groq):
         from analytics.topics import TopicExtractor, TopicTree
         from memory.models import Topic
@@ -52,7 +51,6 @@ class TestTopicExtractor:
         assert assignments[0].topic_slug == "finance"
         assert assignments[0].confidence == 0.85
     
-    @pytest.mark.asyncio
     async def test_extract_filters_low_confidence(self, mock_groq):
         mock_groq.complete_simple = AsyncMock(
             return_value='[{"topic": "finance", "confidence": 0.3}]'
@@ -133,7 +131,6 @@ class TestTopicStatistics:
         db.execute = AsyncMock()
         return db
     
-    @pytest.mark.asyncio
     async def test_get_activity(self, mock_db):
         from analytics.topics import TopicStatistics
         
@@ -200,6 +197,51 @@ class TestTopicAssignment:
         assert assignment.topic_id is None
 
 
+class TestTopicOrchestrator:
+    """Tests for auto-clustering rerun guard."""
+    
+    async def test_recent_run_returns_cached_topics(self):
+        from datetime import timezone, timedelta
+        from analytics.topic_orchestrator import TopicOrchestrator
+        
+        db = MagicMock()
+        db.scalar = AsyncMock(return_value=datetime.now(timezone.utc) - timedelta(minutes=5))
+        cached = MagicMock()
+        cached.all.return_value = [(uuid4(), "Графы", "20260101_1200", 4)]
+        db.execute = AsyncMock(return_value=cached)
+        
+        with patch('analytics.topic_orchestrator.clustering_service') as clustering:
+            clustering.cluster_user_memories = AsyncMock(return_value=[])
+            result = await TopicOrchestrator().run_auto_clustering(db, uuid4(), only_if_stale=True)
+            clustering.cluster_user_memories.assert_not_called()
+            
+            # Explicit runs ignore the freshness guard
+            forced = await TopicOrchestrator().run_auto_clustering(db, uuid4())
+            clustering.cluster_user_memories.assert_awaited_once()
+        
+        assert result["status"] == "cached"
+        assert result["run_id"] == "20260101_1200"
+        assert result["details"][0]["count"] == 4
+        assert forced["status"] == "no_clusters_found"
+    
+    async def test_reclusters_after_interval_with_enough_new_memories(self):
+        from datetime import timezone, timedelta
+        from analytics.topic_orchestrator import TopicOrchestrator
+        
+        orchestrator = TopicOrchestrator()
+        old_run = datetime.now(timezone.utc) - timedelta(days=2)
+        db = MagicMock()
+        
+        db.scalar = AsyncMock(side_effect=[old_run, 3])
+        assert await orchestrator.should_recluster(db, uuid4()) is False
+        
+        db.scalar = AsyncMock(side_effect=[old_run, 50])
+        assert await orchestrator.should_recluster(db, uuid4()) is True
+        
+        db.scalar = AsyncMock(return_value=None)
+        assert await orchestrator.should_recluster(db, uuid4()) is True
+
+
 # Run with: pytest tests/test_topics.py -v
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -92,28 +92,30 @@ def update_embeddings(self, memory_id: str):
 
 
 @app.task(queue='embeddings')
-def reindex_all_embeddings(limit: int = 100):
+def reindex_all_embeddings(limit: Optional[int] = None):
     """
     Reindex all memory embeddings.
     Used for vector DB migration or model updates.
     """
-    from db.database import async_session_maker
+    from db.database import async_session
     from memory.semantic import semantic_memory
-    from memory.models import MemoryItem
-    from sqlalchemy import select
     
     async def _reindex():
         async with async_session() as db:
-            total_indexed = await semantic_memory.reindex_all(db)
+            total_indexed = await semantic_memory.reindex_all(db, limit=limit)
+            await db.commit()
             return {"status": "ok", "indexed": total_indexed}
     
     return asyncio.run(_reindex())
 
 
 @app.task(queue='analytics')
-def run_topic_clustering(user_id: str):
+def run_topic_clustering(user_id: str, only_if_stale: bool = False):
     """
     Run unsupervised clustering for a user's memories.
+    
+    Periodic callers pass only_if_stale=True to skip runs while the
+    previous topics are still fresh.
     """
     from analytics.topic_orchestrator import topic_orchestrator
     from uuid import UUID
@@ -121,12 +123,46 @@ def run_topic_clustering(user_id: str):
     
     async def _run():
         async with async_session() as db:
-            result = await topic_orchestrator.run_auto_clustering(db, UUID(user_id))
+            result = await topic_orchestrator.run_auto_clustering(db, UUID(user_id), only_if_stale=only_if_stale)
             return result
             
     return asyncio.run(_run())
 
 
+@app.task(queue='analytics')
+def recluster_topics():
+    """
+    Periodic topic clustering for all active users.
+    
+    Uses only_if_stale=True: users whose topics are still fresh (see
+    topic_recluster_* settings) get their cached topics and no HDBSCAN run.
+    """
+    from analytics.topic_orchestrator import topic_orchestrator
+    from db.database import async_session
+    from memory.models import User
+    from sqlalchemy import select
+    
+    async def _recluster():
+        async with async_session() as db:
+            user_ids = list(await db.scalars(select(User.id).where(User.is_active == True)))
+            
+            statuses = {}
+            for user_id in user_ids:
+                try:
+                    result = await topic_orchestrator.run_auto_clustering(
+                        db, user_id, only_if_stale=True
+                    )
+                    status = result.get("status", "unknown")
+                except Exception:
+                    await db.rollback()
+                    status = "error"
+                statuses[status] = statuses.get(status, 0) + 1
+            
+            return {"status": "ok", "users": len(user_ids), "results": statuses}
+    
+    return asyncio.run(_recluster())
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # Memory Aggregation Tasks
 # ═══════════════════════════════════════════════════════════════════════════
@@ -329,6 +365,12 @@ app.conf.beat_schedule = {
         'schedule': crontab(hour=0, minute=0),  # Midnight
     },
     
+    # Topic tasks
+    'recluster-topics-hourly': {
+        'task': 'workers.tasks.recluster_topics',
+        'schedule': 3600.0,  # Every hour; skipped per user while topics are fresh
+    },
+    
     # Memory tasks
     'aggregate-memory-daily': {
         'task': 'workers.tasks.aggregate_memory',